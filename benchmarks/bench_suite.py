@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite
+Runs collector, summarizer and API scenarios against a generated corpus and a
+local stand-in for news sites and Ollama, printing one JSON line per scenario
+
+Usage: python benchmarks/bench_suite.py --size 10000 --output results.json
+       python benchmarks/bench_suite.py --size 10000 --compare results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import populate
+from stand_in import StandInConfig, StandInServer
+
+SCENARIOS = ("collect", "summarize", "articles", "trending", "stats", "search")
+
+def latency_stats(samples):
+    """Summary of request latencies in milliseconds"""
+    ordered = sorted(samples)
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+    return {
+        "requests": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(percentile(0.50), 3),
+        "p95_ms": round(percentile(0.95), 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+def time_requests(client, url, repeat, params=None):
+    samples = []
+    response = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url, params=params)
+        samples.append(time.perf_counter() - start)
+        response.raise_for_status()
+    return samples, response
+
+def bench_collect(server, args):
+    from src import collector
+
+    feed_urls = server.feed_urls()
+    requests_before = server.config.requests
+    start = time.perf_counter()
+    feed_states = {}
+    articles = collector.fetch_articles(feed_urls=feed_urls, feed_states=feed_states)
+    fetch_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    saved = collector.save_articles(articles)
+    save_s = time.perf_counter() - start
+    collector.save_feed_states(feed_states)
+    return {
+        "feeds": len(feed_urls),
+        "articles": len(articles),
+        "saved": saved,
+        "http_requests": server.config.requests - requests_before,
+        "fetch_s": round(fetch_s, 3),
+        "fetch_articles_per_s": round(len(articles) / fetch_s, 1) if fetch_s else None,
+        "save_s": round(save_s, 3),
+        "save_articles_per_s": round(saved / save_s, 1) if save_s else None,
+    }
+
+def bench_summarize(server, args):
+    from src.summary_queue import drain_pending_summaries
+
+    calls_before = server.config.llm_calls
+    start = time.perf_counter()
+    summarized = drain_pending_summaries()
+    seconds = time.perf_counter() - start
+    return {
+        "summarized": summarized,
+        "llm_calls": server.config.llm_calls - calls_before,
+        "seconds": round(seconds, 3),
+        "summaries_per_s": round(summarized / seconds, 1) if seconds and summarized else None,
+    }
+
+def bench_articles(client, args):
+    # Walk the newest pages by cursor, as the frontend's infinite scroll does
+    samples = []
+    cursor = None
+    for _ in range(args.pages):
+        params = {"limit": 50}
+        if cursor:
+            params["before"] = cursor
+        start = time.perf_counter()
+        response = client.get("/articles", params=params)
+        samples.append(time.perf_counter() - start)
+        response.raise_for_status()
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    result = {"cursor_pages": latency_stats(samples)}
+    deep, _ = time_requests(client, "/articles", args.repeat, {"limit": 50, "offset": args.size // 2})
+    result["deep_offset"] = latency_stats(deep)
+    return result
+
+def bench_trending(client, args):
+    from src.simple_trending import trending_detector
+
+    result = {}
+    for hours in (24, 168):
+        cold = []
+        for _ in range(args.repeat):
+            trending_detector.cache.clear()
+            start = time.perf_counter()
+            client.get("/trending", params={"hours": hours}).raise_for_status()
+            cold.append(time.perf_counter() - start)
+        warm, _ = time_requests(client, "/trending", args.repeat, {"hours": hours})
+        result[f"{hours}h_cold"] = latency_stats(cold)
+        result[f"{hours}h_cached"] = latency_stats(warm)
+    return result
+
+def bench_stats(client, args):
+    samples, _ = time_requests(client, "/stats", args.repeat)
+    return latency_stats(samples)
+
+def bench_search(client, args):
+    from corpus import vocabulary
+
+    words, _ = vocabulary()
+    result = {}
+    for name, query in (("common_term", words[0]), ("rare_term", words[-1]), ("two_terms", f"{words[1]} {words[2]}")):
+        samples, _ = time_requests(client, "/search", args.repeat, {"q": query, "limit": 20})
+        result[name] = latency_stats(samples)
+    return result
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline_path, tolerance):
+    """Print scenario metrics that moved by more than ``tolerance`` against a saved run"""
+    with open(baseline_path) as f:
+        baseline = {row["scenario"]: row for row in json.load(f)["results"]}
+
+    def walk(prefix, new, old):
+        if isinstance(new, dict) and isinstance(old, dict):
+            for key in new:
+                if key in old:
+                    yield from walk(f"{prefix}.{key}", new[key], old[key])
+        elif isinstance(new, (int, float)) and isinstance(old, (int, float)) and old:
+            yield prefix, old, new, (new - old) / old
+
+    changes = []
+    for row in results:
+        old = baseline.get(row["scenario"])
+        if old:
+            for metric, before, after, change in walk(row["scenario"], row, old):
+                # Only time-like metrics; counts differ when the corpus does
+                if metric.endswith(("_ms", "_s", "_per_s")) and abs(change) > tolerance:
+                    changes.append({"metric": metric, "before": before, "after": after,
+                                    "change_pct": round(change * 100, 1)})
+    print(json.dumps({"compare": baseline_path, "changes": changes}, indent=2))
+    return changes
+
+def main():
+    parser = argparse.ArgumentParser(description='Collector and API benchmark suite')
+    parser.add_argument('--size', type=int, default=10000, help='Corpus size (e.g. 10000, 100000, 1000000)')
+    parser.add_argument('--db', help='Database URL (default: a SQLite file per corpus size under benchmarks/.data)')
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS), help='Scenarios to run')
+    parser.add_argument('--repeat', type=int, default=20, help='Requests per latency measurement')
+    parser.add_argument('--pages', type=int, default=20, help='Pages walked in the /articles scenario')
+    parser.add_argument('--feeds', type=int, default=10, help='Stand-in feeds for the collect scenario')
+    parser.add_argument('--items', type=int, default=20, help='Entries per stand-in feed')
+    parser.add_argument('--latency', type=float, default=50, help='Stand-in response latency in milliseconds')
+    parser.add_argument('--llm-latency', type=float, default=20, help='Stub LLM latency in milliseconds')
+    parser.add_argument('--full-content', type=float, default=0.0, help='Share of feed entries embedding full content')
+    parser.add_argument('--output', help='Also write all results to this JSON file')
+    parser.add_argument('--compare', help='Report metrics that changed against an earlier --output file')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Relative change reported by --compare')
+    args = parser.parse_args()
+
+    config = StandInConfig(feeds=args.feeds, items=args.items, latency=args.latency / 1000,
+                           llm_latency=args.llm_latency / 1000, full_content=args.full_content)
+    server = StandInServer(config=config).start()
+
+    # Configure the app before it is imported
+    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data")
+    if not args.db:
+        os.makedirs(data_dir, exist_ok=True)
+    os.environ["DATABASE_URL"] = args.db or f"sqlite:///{os.path.join(data_dir, f'bench-{args.size}.db')}"
+    os.environ["OLLAMA_URL"] = server.url
+    # The stand-in serves its feeds from 127.0.0.1
+    os.environ["FEED_ALLOW_PRIVATE_HOSTS"] = "1"
+    os.chdir(ROOT)
+
+    results = []
+    def record(scenario, metrics):
+        row = {"scenario": scenario, **metrics}
+        results.append(row)
+        print(json.dumps(row), flush=True)
+
+    try:
+        record("corpus", populate(args.size))
+
+        from fastapi.testclient import TestClient
+        from src.main import app
+        client = TestClient(app)
+
+        for scenario in args.scenarios:
+            if scenario == "collect":
+                record(scenario, bench_collect(server, args))
+            elif scenario == "summarize":
+                record(scenario, bench_summarize(server, args))
+            else:
+                bench = globals()[f"bench_{scenario}"]
+                record(scenario, bench(client, args))
+    finally:
+        server.stop()
+
+    meta = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "database": os.environ["DATABASE_URL"].split("@")[-1],
+        "args": vars(args),
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+    if args.compare:
+        compare(results, args.compare, args.tolerance)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Corpus Generator
+Fills a database with synthetic articles through the normal save path
+(term index, counters, compressed bodies, fingerprints)
+
+Usage: DATABASE_URL=sqlite:///./bench.db python benchmarks/corpus.py --size 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+# Add project root to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# Function words keep the text looking like prose to newspaper's extractor
+FUNCTION_WORDS = (
+    "the of and to in a is that for it as was with be by on not he this are or his from at which "
+    "but have an they you were her she there been one all we their has would when if so no will "
+    "more about up out who can said into than its also after new some could over"
+).split()
+
+_vocabulary = None
+
+def vocabulary(size=5000, seed=42):
+    """Topic words with cumulative Zipf-like weights, the same on every call"""
+    global _vocabulary
+    if _vocabulary is None:
+        rng = random.Random(seed)
+        letters = "abcdefghijklmnopqrstuvwxyz"
+        words = sorted({
+            "".join(rng.choice(letters) for _ in range(rng.randint(4, 10)))
+            for _ in range(size)
+        })
+        rng.shuffle(words)
+        # Cumulative once here; passing plain weights makes choices() re-add
+        # the whole vocabulary for every sentence
+        _vocabulary = (words, list(accumulate(1 / (rank + 1) for rank in range(len(words)))))
+    return _vocabulary
+
+def make_sentence(rng, words=None):
+    topic_words, cum_weights = vocabulary()
+    length = words or rng.randint(8, 24)
+    picked = rng.choices(topic_words, cum_weights=cum_weights, k=length)
+    sentence = [
+        rng.choice(FUNCTION_WORDS) if rng.random() < 0.45 else word
+        for word in picked
+    ]
+    return " ".join(sentence).capitalize() + "."
+
+def make_paragraphs(rng, count, sentences=5):
+    return [" ".join(make_sentence(rng) for _ in range(sentences)) for _ in range(count)]
+
+def make_article(rng, index, published, seed=42, feeds=10):
+    return {
+        "title": make_sentence(rng, words=rng.randint(6, 12)).rstrip("."),
+        "link": f"https://corpus.example/{seed}/{index}",
+        "content": "\n\n".join(make_paragraphs(rng, rng.randint(4, 12))),
+        "summary": "",
+        "image_url": None,
+        "published": published,
+        "feed_url": f"https://corpus.example/feeds/{index % feeds}.xml"
+    }
+
+def iter_corpus(size, start=0, days=30, duplicates=0.0, seed=42):
+    """Yield articles ``start``..``size`` spread evenly over the last ``days`` days.
+
+    ``duplicates`` is the share of articles that repeat an earlier story's
+    text under a new link, as syndicated wire copies do.
+    """
+    now = datetime.now(timezone.utc)
+    step = timedelta(days=days) / max(size, 1)
+    recent = []
+    for index in range(start, size):
+        rng = random.Random(f"{seed}-{index}")
+        published = now - timedelta(days=days) + step * index
+        article = make_article(rng, index, published, seed)
+        if recent and rng.random() < duplicates:
+            original = rng.choice(recent)
+            article["title"], article["content"] = original["title"], original["content"]
+        recent.append(article)
+        if len(recent) > 1000:
+            recent.pop(0)
+        yield article
+
+def populate(size, batch_size=1000, days=30, duplicates=0.0, seed=42):
+    """Bring the configured database up to ``size`` corpus articles, returning timing details"""
+    from sqlalchemy import func
+    from src.collector import save_articles
+    from src.models import SessionLocal, Article, init_db
+
+    init_db()
+    db = SessionLocal()
+    try:
+        existing = db.query(func.count(Article.id)).filter(
+            Article.link.like(f"https://corpus.example/{seed}/%")
+        ).scalar()
+    finally:
+        db.close()
+    if existing >= size:
+        return {"articles": size, "generated": 0, "seconds": 0.0}
+
+    start = time.perf_counter()
+    saved = save_articles(iter_corpus(size, existing, days, duplicates, seed), batch_size)
+    seconds = time.perf_counter() - start
+    return {
+        "articles": size,
+        "generated": saved,
+        "seconds": round(seconds, 3),
+        "articles_per_s": round(saved / seconds, 1) if seconds else None
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Fill the database with synthetic articles')
+    parser.add_argument('--size', type=int, default=10000, help='Total corpus articles wanted')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Articles per insert transaction')
+    parser.add_argument('--days', type=float, default=30, help='Spread publish times over this many days')
+    parser.add_argument('--duplicates', type=float, default=0.0, help='Share of near-duplicate copies (0-1)')
+    args = parser.parse_args()
+
+    print(populate(args.size, args.batch_size, args.days, args.duplicates))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Local HTTP Stand-in
+Serves generated RSS feeds, article pages and a stub Ollama endpoint so the
+collector and summarizer can be benchmarked without touching real sites
+
+Usage: python benchmarks/stand_in.py --port 8765 --latency 50
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from corpus import make_paragraphs
+
+class StandInConfig:
+    """Knobs for the generated responses, shared by all request threads"""
+
+    def __init__(self, feeds=10, items=10, paragraphs=12, latency=0.0, llm_latency=0.0,
+                 full_content=0.0, run_id=None):
+        self.feeds = feeds
+        self.items = items  # Entries per feed
+        self.paragraphs = paragraphs  # Paragraphs per article page
+        self.latency = latency  # Seconds added to every feed and page response
+        self.llm_latency = llm_latency  # Seconds added to every /api/generate call
+        self.full_content = full_content  # Share of entries that embed the full article
+        # Part of every article URL, so each run of a benchmark sees new articles
+        self.run_id = run_id or hashlib.sha1(str(time.time()).encode()).hexdigest()[:8]
+        self.requests = 0
+        self.llm_calls = 0
+        # The next this many /api/generate calls answer 500, as an overloaded model server does
+        self.llm_failures = 0
+        self._lock = threading.Lock()
+
+    def count(self, llm=False):
+        with self._lock:
+            if llm:
+                self.llm_calls += 1
+            else:
+                self.requests += 1
+
+    def take_llm_failure(self) -> bool:
+        with self._lock:
+            if self.llm_failures <= 0:
+                return False
+            self.llm_failures -= 1
+            return True
+
+def _rng(*parts):
+    # Every URL always returns the same content
+    return random.Random(hashlib.sha1("/".join(map(str, parts)).encode()).hexdigest())
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = StandInConfig()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body: bytes, content_type: str, status: int = 200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        config = self.config
+        config.count()
+        if config.latency:
+            time.sleep(config.latency)
+
+        url = urlsplit(self.path)
+        parts = url.path.strip("/").split("/")
+        if parts == ["redirect"]:
+            # Answers 302 to ?to=..., as a feed or article URL that moved does
+            self.send_response(302)
+            self.send_header("Location", parse_qs(url.query).get("to", ["/"])[0])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif parts[0] == "feeds" and len(parts) == 2:
+            self._send(self.feed(parts[1].removesuffix(".xml")), "application/rss+xml")
+        elif parts[0] == "articles" and len(parts) == 4:
+            self._send(self.page(*parts[1:]), "text/html; charset=utf-8")
+        else:
+            self._send(b"not found", "text/plain", status=404)
+
+    def do_POST(self):
+        config = self.config
+        if self.path != "/api/generate":
+            self._send(b"not found", "text/plain", status=404)
+            return
+        config.count(llm=True)
+        length = int(self.headers.get("Content-Length") or 0)
+        prompt = json.loads(self.rfile.read(length) or b"{}").get("prompt", "")
+        if config.take_llm_failure():
+            self._send(b'{"error": "model overloaded"}', "application/json", status=500)
+            return
+        if config.llm_latency:
+            time.sleep(config.llm_latency)
+        result = {
+            "summary": f"Stub summary of {len(prompt)} characters.",
+            "key_points": ["first point", "second point"],
+            "sentiment": "neutral"
+        }
+        self._send(json.dumps({"response": json.dumps(result), "done": True}).encode(), "application/json")
+
+    def feed(self, feed_id: str) -> bytes:
+        config = self.config
+        host = self.headers.get("Host")
+        rng = _rng("feed", feed_id, config.run_id)
+        items = []
+        for i in range(config.items):
+            link = f"http://{host}/articles/{feed_id}/{config.run_id}/{i}"
+            title = " ".join(make_paragraphs(_rng("title", link), 1, sentences=1)[0].split()[:8])
+            embedded = ""
+            if rng.random() < config.full_content:
+                html = "".join(f"<p>{p}</p>" for p in make_paragraphs(_rng(link), config.paragraphs))
+                embedded = f"<content:encoded><![CDATA[{html}]]></content:encoded>"
+            items.append(
+                f"<item><title>{escape(title)}</title><link>{link}</link>"
+                f"<description>{escape(title)}</description>{embedded}</item>"
+            )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/"><channel>'
+            f"<title>Stand-in feed {feed_id}</title><link>http://{host}/</link>"
+            + "".join(items) + "</channel></rss>"
+        ).encode()
+
+    def page(self, feed_id: str, run_id: str, item: str) -> bytes:
+        link = f"http://{self.headers.get('Host')}/articles/{feed_id}/{run_id}/{item}"
+        paragraphs = "".join(f"<p>{p}</p>" for p in make_paragraphs(_rng(link), self.config.paragraphs))
+        return (
+            "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Stand-in article</title></head><body>"
+            "<nav><a href='/'>Home</a> <a href='/tech'>Tech</a></nav>"
+            f"<article><h1>Article {feed_id}-{item}</h1>{paragraphs}</article>"
+            "<footer>Copyright stand-in</footer></body></html>"
+        ).encode()
+
+class StandInServer:
+    """Runs the stand-in on a background thread"""
+
+    def __init__(self, port: int = 0, config: StandInConfig = None):
+        self.config = config or StandInConfig()
+        handler = type("Handler", (StandInHandler,), {"config": self.config})
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def feed_urls(self):
+        return [f"{self.url}/feeds/{i}.xml" for i in range(self.config.feeds)]
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for news sites and Ollama')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    parser.add_argument('--feeds', type=int, default=10, help='Number of feeds')
+    parser.add_argument('--items', type=int, default=10, help='Entries per feed')
+    parser.add_argument('--paragraphs', type=int, default=12, help='Paragraphs per article page')
+    parser.add_argument('--latency', type=float, default=0, help='Milliseconds added to feed and page responses')
+    parser.add_argument('--llm-latency', type=float, default=0, help='Milliseconds added to /api/generate')
+    parser.add_argument('--full-content', type=float, default=0, help='Share of entries with content:encoded (0-1)')
+    args = parser.parse_args()
+
+    config = StandInConfig(args.feeds, args.items, args.paragraphs, args.latency / 1000,
+                           args.llm_latency / 1000, args.full_content)
+    server = StandInServer(args.port, config)
+    print(f"🌐 Serving {args.feeds} feeds at {server.url}/feeds/<n>.xml and Ollama at {server.url}/api/generate")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
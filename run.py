@@ -10,7 +10,8 @@ import os
 # Add src directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.collector import create_table, fetch_articles, save_articles
+from src.collector import create_table, run_collection
+from src.summary_queue import drain_pending_summaries
 from src.simple_trending import trending_detector
 
 def main():
@@ -21,8 +22,10 @@ def main():
     create_table()
     
     # Fetch and save articles
-    articles = fetch_articles()
-    save_articles(articles)
+    run_collection()
+    
+    # Summarize the newly queued articles
+    drain_pending_summaries()
     
     print("✅ News collection completed!")
 
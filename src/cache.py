@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Hashable, Optional, Tuple
+
+class LRUCache:
+    """Small thread-safe LRU mapping"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+class TTLCache:
+    """Bounded result cache with expiry, invalidation and stale-while-revalidate.
+
+    Only one computation per key runs at a time: concurrent misses wait for
+    the same result, and once an entry is expired, invalidated or from an
+    older version callers keep getting the previous value while a single
+    background refresh runs.
+
+    With a ``version`` callable (such as ``data_version.get``) each entry
+    remembers the version it was computed under; ``get_versioned`` returns
+    it with the value, so a response can be tagged with the version of the
+    data it actually carries rather than the newest one.
+    """
+
+    def __init__(self, ttl: float, maxsize: int, version: Optional[Callable] = None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._version = version
+        self._entries = OrderedDict()  # key -> (value, expires_at, generation, version)
+        self._in_flight = {}  # (key, version) -> Future for the running computation
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Mark every entry stale; they are refreshed on next use"""
+        with self._lock:
+            self._generation += 1
+
+    def clear(self):
+        """Drop every entry, so the next use computes afresh"""
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, key: Hashable, compute: Callable):
+        return self.get_versioned(key, compute)[0]
+
+    def get_versioned(self, key: Hashable, compute: Callable) -> Tuple[object, object]:
+        """Return ``(value, version it was computed under)``"""
+        # Read before computing, so an entry is never labelled newer than its data
+        version = self._version() if self._version else None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                value, expires_at, generation, entry_version = entry
+                if entry_version == version and expires_at > time.monotonic() and generation == self._generation:
+                    return value, entry_version
+            future = self._in_flight.get((key, version))
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[(key, version)] = future
+
+        if entry is not None:
+            # Serve the previous result while one refresh runs in the background
+            if owner:
+                threading.Thread(target=self._compute, args=(key, version, compute, future), daemon=True).start()
+            return entry[0], entry[3]
+
+        if owner:
+            self._compute(key, version, compute, future)
+        return future.result(), version
+
+    def _compute(self, key, version, compute, future):
+        with self._lock:
+            generation = self._generation
+        try:
+            value = compute()
+        except Exception as e:
+            print(f"❌ Failed to compute cached result for {key}: {e}")
+            with self._lock:
+                self._in_flight.pop((key, version), None)
+            future.set_exception(e)
+            return
+
+        with self._lock:
+            current = self._entries.get(key)
+            # A slow refresh must not replace the result for a newer version
+            outdated = current is not None and None not in (current[3], version) and current[3] > version
+            if not outdated:
+                self._entries[key] = (value, time.monotonic() + self.ttl, generation, version)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            self._in_flight.pop((key, version), None)
+        future.set_result(value)
@@ -1,9 +1,27 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
 import feedparser
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from newspaper import Article as NewsArticle
 from datetime import datetime, timezone
-import requests
-from .models import SessionLocal, Article, init_db
-from .summarizer import get_simple_summary
+from .content_store import inline_content, make_preview, store_bodies
+from .dedup import link_duplicates, store_fingerprints
+from .events import notify_events
+from .extraction import ExtractionPool, MAX_HTML_BYTES, PARSE_WORKERS, feed_entry_text
+from .feeds import enabled_feed_urls, record_polls, register_feeds
+from .fetcher import Fetcher
+from .http_cache import data_changed
+from .metrics import ARTICLES, COLLECTIONS, FEEDS, STAGE_ERRORS, StageTimings, record_stage, timed
+from .models import SessionLocal, Article, FeedState, Metadata, dialect_insert, init_db
+from .simple_trending import trending_detector
+from .stats import count_articles
+from .summary_queue import MIN_CONTENT_LENGTH, enqueue_links, notify_workers
+# Default feeds, added to the feed registry (see feeds.py) on first use;
+# more can be registered there or imported from OPML
 RSS_FEEDS = [
     # Tech-specific RSS feeds
     # "https://techcrunch.com/feed/",  # TechCrunch
@@ -26,9 +44,49 @@ RSS_FEEDS = [
 # 1️⃣ Initialize database
 def create_table():
     init_db()
+    register_feeds((url, None) for url in RSS_FEEDS)
+
+def registered_feed_urls():
+    """Every enabled feed in the registry"""
+    register_feeds((url, None) for url in RSS_FEEDS)
+    return enabled_feed_urls()
 
 # 2️⃣ No filtering - collect all articles from feeds
 
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid", "ref", "ref_src", "cmpid", "ncid"}
+
+def normalize_link(url):
+    """Canonicalize an article URL so the same story dedups under one link"""
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    if not parts.scheme or not parts.netloc:
+        return url
+    
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    ]
+    path = parts.path
+    if len(path) > 1:
+        path = path.rstrip("/")
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path or "/", urlencode(query), ""))
+
+def find_existing_links(links):
+    """Return which of ``links`` are already stored, in a single query"""
+    links = list(links)
+    if not links:
+        return set()
+    db = SessionLocal()
+    try:
+        rows = db.query(Article.link).filter(Article.link.in_(links)).all()
+        return {row.link for row in rows}
+    finally:
+        db.close()
+
 # 3️⃣ Extract image URL from RSS entry
 def extract_image_url(entry):
     """Extract image URL from RSS entry, checking multiple possible fields"""
@@ -80,129 +138,535 @@ def extract_image_url(entry):
     return None
 
 # 4️⃣ Extract full article content
-def extract_article_content(url):
+def extract_article_content(url, html=None):
+    """Extract article text, parsing ``html`` when it was already downloaded"""
     try:
         article = NewsArticle(url)
-        article.download()
+        if html is None:
+            article.download()
+        else:
+            article.download(input_html=html)
         article.parse()
         return article.text.strip()
     except:
         return ""
 
+class CollectionProgress:
+    """Thread-safe counters describing a collection run while it happens"""
+    
+    # Keep only the first few error messages so a bad run stays readable
+    MAX_ERRORS = 50
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.feeds_total = 0
+        self.feeds_done = 0
+        self.articles_found = 0
+        self.articles_processed = 0
+        self.articles_saved = 0
+        self.downloads_avoided = 0
+        self.duplicates_linked = 0
+        self.error_count = 0
+        self.errors = []
+        self.per_feed = {}
+        # Feeds with articles in a batch that failed to save
+        self.unsaved_feeds = set()
+        self.timings = StageTimings()
+        self.duration = None
+    
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+    
+    def add_for_feed(self, feed_url, **counts):
+        """Add to per-feed counters (and the matching run totals)"""
+        with self._lock:
+            feed = self.per_feed.setdefault(feed_url, {})
+            for name, value in counts.items():
+                feed[name] = feed.get(name, 0) + value
+                if hasattr(self, name):
+                    setattr(self, name, getattr(self, name) + value)
+    
+    def error(self, message):
+        with self._lock:
+            self.error_count += 1
+            if len(self.errors) < self.MAX_ERRORS:
+                self.errors.append(message)
+    
+    def batch_failed(self, feed_urls, message):
+        """Record a batch that wasn't stored, so its feeds keep their old validators"""
+        self.error(message)
+        with self._lock:
+            self.unsaved_feeds.update(url for url in feed_urls if url)
+    
+    def feed_failed(self, feed_url, error):
+        """Mark a feed's poll as failed, for its backoff"""
+        self.error(f"{feed_url}: {error}")
+        with self._lock:
+            feed = self.per_feed.setdefault(feed_url, {})
+            feed["failed"] = 1
+            feed["error"] = str(error)
+    
+    def finish(self, seconds):
+        """Record the run's total duration"""
+        record_stage("collection", seconds)
+        with self._lock:
+            self.duration = seconds
+    
+    def summary(self):
+        """Run totals and per-stage timings, without the per-feed breakdown"""
+        summary = self.to_dict()
+        summary.pop("per_feed")
+        summary.pop("errors")
+        return summary
+    
+    def to_dict(self):
+        with self._lock:
+            return {
+                "feeds_total": self.feeds_total,
+                "feeds_done": self.feeds_done,
+                "articles_found": self.articles_found,
+                "articles_processed": self.articles_processed,
+                "articles_saved": self.articles_saved,
+                "downloads_avoided": self.downloads_avoided,
+                "duplicates_linked": self.duplicates_linked,
+                "error_count": self.error_count,
+                "duration_s": round(self.duration, 3) if self.duration is not None else None,
+                "errors": list(self.errors),
+                "per_feed": {feed: dict(counts) for feed, counts in self.per_feed.items()},
+                "stages": self.timings.to_dict()
+            }
+
+def load_feed_states(feed_urls):
+    """Load the stored HTTP validators for the given feeds, keyed by URL"""
+    db = SessionLocal()
+    try:
+        rows = db.query(FeedState).filter(FeedState.feed_url.in_(list(feed_urls))).all()
+        return {
+            row.feed_url: {
+                "etag": row.etag,
+                "last_modified": row.last_modified,
+                "content_hash": row.content_hash
+            } for row in rows
+        }
+    finally:
+        db.close()
+
+def save_feed_states(states):
+    """Persist updated HTTP validators in a single transaction"""
+    if not states:
+        return
+    db = SessionLocal()
+    try:
+        existing = {
+            row.feed_url: row
+            for row in db.query(FeedState).filter(FeedState.feed_url.in_(list(states))).all()
+        }
+        now = datetime.now(timezone.utc)
+        for feed_url, state in states.items():
+            row = existing.get(feed_url)
+            if row is None:
+                row = FeedState(feed_url=feed_url)
+                db.add(row)
+            row.etag = state.get("etag")
+            row.last_modified = state.get("last_modified")
+            row.content_hash = state.get("content_hash")
+            row.updated_at = now
+        db.commit()
+    except Exception as e:
+        print(f"❌ Failed to save feed state: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+def fetch_feed(fetcher, feed_url, state=None, timings=None):
+    """Download and parse a single RSS feed using conditional GET.
+
+    Returns ``(feed, new_state)``; ``feed`` is None when the server answered
+    304 or the body is byte-identical to the last poll.
+    """
+    state = state or {}
+    headers = {}
+    if state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state.get("last_modified"):
+        headers["If-Modified-Since"] = state["last_modified"]
+    
+    with timed("feed_fetch", timings):
+        response = fetcher.get(feed_url, headers=headers)
+    if response.status_code == 304:
+        return None, state
+    response.raise_for_status()
+    
+    content_hash = hashlib.sha256(response.content).hexdigest()
+    new_state = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "content_hash": content_hash
+    }
+    if content_hash == state.get("content_hash"):
+        return None, new_state
+    with timed("feed_parse", timings):
+        return feedparser.parse(response.content), new_state
+
+def download_entry(fetcher, item, timings=None):
+    """Download the raw HTML of one new feed entry (network stage)"""
+    with timed("download", timings):
+        return fetcher.download(item["link"], MAX_HTML_BYTES)
+
+def make_article(item, content):
+    """Build the article record for a processed feed entry.
+
+    Summaries are produced later by the background workers in summary_queue.py,
+    so ingestion never waits on the LLM.
+    """
+    print(f"{item['title']} — content length: {len(content)}")
+    return {
+        "title": item["title"],
+        "link": item["link"],
+        "published": datetime.now(timezone.utc),
+        "content": content,
+        "summary": "",
+        "image_url": item["image_url"],
+        "feed_url": item.get("feed_url")
+    }
+
 # 3️⃣ Fetch articles from RSS
-def fetch_articles():
-    articles = []
-    
-    for feed_url in RSS_FEEDS:
-        try:
-            # Use requests to fetch the feed content
-            response = requests.get(feed_url, 
-                                 headers={'User-Agent': 'Mozilla/5.0'}, 
-                                 timeout=10,
-                                 verify=False)  # Disable SSL verification for development
-            response.raise_for_status()
-            
-            # Parse the feed content
-            feed = feedparser.parse(response.content)
-            print(f"Feed: {feed_url} — {len(feed.entries)} entries")
-            
-            if feed.bozo:
-                print(f"  Warning: Feed parsing issues - {feed.bozo_exception}")
-        except Exception as e:
-            print(f"  Error fetching {feed_url}: {e}")
+def iter_articles(fetcher=None, feed_states=None, progress=None, feed_urls=None):
+    """Stream new articles from ``feed_urls`` (default: every enabled feed) as they are fetched and extracted.
+
+    Each feed's entries are handed on as soon as that feed has been
+    fetched, so memory stays flat however many feeds there are. Updated
+    feed validators are written into ``feed_states`` for the caller to
+    save (save_feed_states) once the articles are stored; they are never
+    saved here. Counts and errors are reported to ``progress`` (a
+    CollectionProgress) when given.
+    """
+    progress = progress or CollectionProgress()
+    own_fetcher = fetcher is None
+    if own_fetcher:
+        fetcher = Fetcher()
+    if feed_states is None:
+        feed_states = {}
+    
+    try:
+        if feed_urls is None:
+            feed_urls = registered_feed_urls()
+        states = load_feed_states(feed_urls)
+        progress.add(feeds_total=len(feed_urls))
+        seen_links = set()
+        # Articles complete in the feed go straight through; the rest are
+        # downloaded on the fetch threads (bounded per host) and parsed in
+        # worker processes, each handed on as soon as it is ready
+        with ExtractionPipeline(fetcher, progress) as pipeline:
+            for feed_url, result, error in fetcher.map_by_host(
+                    lambda url: fetch_feed(fetcher, url, states.get(url), progress.timings), feed_urls):
+                progress.add(feeds_done=1)
+                if error is not None:
+                    print(f"  Error fetching {feed_url}: {error}")
+                    progress.feed_failed(feed_url, error)
+                    FEEDS.inc(result="error")
+                    continue
+                feed, feed_states[feed_url] = result
+                if feed is None:
+                    print(f"Feed: {feed_url} — not modified")
+                    FEEDS.inc(result="not_modified")
+                    continue
+                FEEDS.inc(result="new")
+                print(f"Feed: {feed_url} — {len(feed.entries)} entries")
+                if feed.bozo:
+                    print(f"  Warning: Feed parsing issues - {feed.bozo_exception}")
+                
+                new_entries = new_feed_entries(feed, feed_url, seen_links)
+                if not new_entries:
+                    continue
+                avoided = sum(bool(item["content"]) for item in new_entries)
+                print(f"  📄 Used feed content for {avoided}/{len(new_entries)} new entries, skipping their downloads")
+                progress.add(articles_found=len(new_entries))
+                progress.add_for_feed(feed_url, new_entries=len(new_entries), downloads_avoided=avoided)
+                ARTICLES.inc(len(new_entries), result="found")
+                ARTICLES.inc(avoided, result="feed_content")
+                for item in new_entries:
+                    if item["content"]:
+                        progress.add(articles_processed=1)
+                        yield make_article(item, item["content"])
+                    else:
+                        yield from pipeline.add(item)
+            yield from pipeline.drain()
+    finally:
+        if own_fetcher:
+            fetcher.close()
+
+def new_feed_entries(feed, feed_url, seen_links):
+    """The entries of a parsed feed (up to 10) whose links aren't stored or ``seen_links`` yet"""
+    candidates = []
+    for entry in feed.entries[:10]:  # Process up to 10 articles per feed
+        title = entry.get("title", "")
+        raw_link = entry.get("link", "")
+        if not title or not raw_link:
             continue
-            
-        for entry in feed.entries[:10]:  # Process up to 10 articles per feed
-            title = entry.get("title", "")
-            link = entry.get("link", "")
-            if not title or not link:
-                continue
-            
+        candidates.append((entry, title, raw_link, normalize_link(raw_link)))
+    
+    # Check which articles already exist BEFORE expensive operations,
+    # matching both the normalized and the raw link of older rows
+    existing = find_existing_links(
+        {link for _, _, _, link in candidates} | {raw for _, _, raw, _ in candidates}
+    )
+    
+    new_entries = []
+    for entry, title, raw_link, link in candidates:
+        if link in existing or raw_link in existing or link in seen_links:
+            print(f"  ⏭️  Skipping duplicate: {title[:50]}...")
+            continue
+        seen_links.add(link)
+        new_entries.append({
+            "title": title,
+            "link": link,
+            "feed_url": feed_url,
             # Extract image URL from various RSS fields
-            image_url = extract_image_url(entry)
-            
-            # Check if article already exists BEFORE expensive operations
-            db = SessionLocal()
-            existing = db.query(Article).filter(Article.link == link).first()
-            db.close()
-            
-            if existing:
-                print(f"  ⏭️  Skipping duplicate: {title[:50]}...")
-                continue
-                
-            content = extract_article_content(link)
-            print(f"{title} — content length: {len(content)}")
-            
-            # Generate summary if content is substantial
-            summary = ""
-            if content and len(content) > 100:
+            "image_url": extract_image_url(entry),
+            # Full-content feeds carry the article in content:encoded, so
+            # the page only needs downloading when that looks incomplete
+            "content": feed_entry_text(entry)
+        })
+    return new_entries
+
+class ExtractionPipeline:
+    """Downloads entries and parses them in the extraction pool as they arrive.
+
+    ``add`` and ``drain`` yield finished articles. Downloads and parses in
+    flight are capped, so ``add`` waits for some to finish when the
+    network or the parsers fall behind. The extraction stage is timed from
+    submission to result, so it includes any wait for a free worker.
+    """
+
+    def __init__(self, fetcher, progress):
+        self.fetcher = fetcher
+        self.progress = progress
+        self._extractor = None
+        self.downloads = {}
+        self.parsing = {}
+        # Enough queued work to keep every thread and worker busy without
+        # buffering every downloaded page in memory
+        self.max_downloads = 2 * fetcher.max_workers
+        self.max_parsing = 2 * max(1, PARSE_WORKERS)
+
+    @property
+    def extractor(self):
+        # Started on the first download, so runs served from feed content need no workers
+        if self._extractor is None:
+            self._extractor = ExtractionPool()
+        return self._extractor
+
+    def add(self, item):
+        timings = self.progress.timings
+        self.downloads[self.fetcher.submit(download_entry, item["link"], self.fetcher, item, timings)] = item
+        while len(self.downloads) >= self.max_downloads or len(self.parsing) >= self.max_parsing:
+            yield from self._step()
+
+    def drain(self):
+        while self.downloads or self.parsing:
+            yield from self._step()
+
+    def _step(self):
+        extractor = self.extractor
+        timeout = extractor.stall_timeout if self.parsing else None
+        done, _ = wait([*self.downloads, *self.parsing], timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            # Every parse in Python code ends within the timeout, so the
+            # workers are stuck in C; replacing them fails what they held
+            print(f"⚠️  No parse finished in {extractor.stall_timeout:.0f}s, restarting the extraction workers")
+            extractor.restart(kill=True)
+            done, _ = wait([*self.downloads, *self.parsing], return_when=FIRST_COMPLETED)
+        for future in done:
+            if future in self.downloads:
+                item = self.downloads.pop(future)
                 try:
-                    summary = get_simple_summary(content)
-                    print(f"  Generated summary: {summary[:100]}...")
+                    html = future.result()
                 except Exception as e:
-                    print(f"  Failed to generate summary: {e}")
-                    summary = ""
-            
-            articles.append({
-                "title": title,
-                "link": link,
-                "published": datetime.now(timezone.utc),
-                "content": content,
-                "summary": summary,
-                "image_url": image_url
-            })
-    return articles
+                    print(f"  Error downloading {item['link']}: {e}")
+                    self.progress.error(f"{item['link']}: {e}")
+                    self.progress.add(articles_processed=1)
+                    yield make_article(item, "")
+                    continue
+                self.parsing[extractor.submit(item["link"], html)] = (item, time.perf_counter())
+            else:
+                item, submitted = self.parsing.pop(future)
+                record_stage("extraction", time.perf_counter() - submitted, self.progress.timings)
+                try:
+                    content = future.result()
+                except Exception as e:
+                    STAGE_ERRORS.inc(stage="extraction")
+                    print(f"  Error parsing {item['link']}: {e!r}")
+                    self.progress.error(f"{item['link']}: {e!r}")
+                    content = ""
+                self.progress.add(articles_processed=1)
+                yield make_article(item, content)
+
+    def close(self):
+        for future in self.downloads:
+            future.cancel()
+        if self._extractor is not None:
+            self._extractor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def fetch_articles(fetcher=None, feed_urls=None, feed_states=None):
+    """Fetch feeds (default: every enabled feed) and their new articles into a list.
+
+    Updated feed validators go into ``feed_states``; save them with
+    save_feed_states after the articles are stored, so a failed save
+    doesn't leave entries that will never be fetched again.
+    """
+    return list(iter_articles(fetcher, feed_states=feed_states, feed_urls=feed_urls))
 
 # 4️⃣ Save to Database
-def save_articles(articles):
-    from .models import Metadata
-    from datetime import datetime, timezone
-    
+BATCH_SIZE = int(os.getenv("COLLECTOR_BATCH_SIZE", "50"))
+
+def _touch_last_fetch(db):
+    """Record the current time as the last successful fetch"""
+    now = datetime.now(timezone.utc)
+    # Upsert so concurrent collectors don't race on creating the row
+    stmt = dialect_insert(Metadata.__table__).values(key="last_fetch", value=now.isoformat(), updated_at=now)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["key"],
+        set_={"value": stmt.excluded.value, "updated_at": stmt.excluded.updated_at}
+    ))
+
+def _write_batch(db, batch, progress=None):
+    """Insert one batch in a single transaction, returning the number of new rows"""
+    rows = [{
+        "title": art["title"],
+        "link": art["link"],
+        "content": art["content"],
+        "summary": art["summary"],
+        "image_url": art["image_url"],
+        "published": art["published"],
+        "feed_url": art.get("feed_url")
+    } for art in batch]
+    columns = ("title", "link", "summary", "image_url", "published", "canonical_id")
+    timings = progress.timings if progress else None
+    start = time.perf_counter()
+    try:
+        # Near-duplicates of a recent story are linked to the first copy
+        with timed("dedup", timings):
+            link_duplicates(db, rows)
+        
+        # Links already present (e.g. saved by a concurrent run) are skipped.
+        # Originals go first so same-batch duplicates can point at their ids.
+        table = Article.__table__
+        stmt = dialect_insert(table).on_conflict_do_nothing(index_elements=["link"]).returning(table.c.id, table.c.link)
+        inserted = {}
+        for group in ([row for row in rows if "canonical_link" not in row],
+                      [row for row in rows if "canonical_link" in row]):
+            for row in group:
+                if "canonical_link" in row:
+                    row["canonical_id"] = inserted.get(row["canonical_link"])
+            if group:
+                result = db.execute(stmt, [
+                    dict({column: row.get(column) for column in columns},
+                         content=inline_content(row["content"]), preview=make_preview(row["content"]))
+                    for row in group
+                ])
+                inserted.update({row.link: row.id for row in result})
+        saved = len(inserted)
+        duplicates = 0
+        if saved:
+            _touch_last_fetch(db)
+            # Index terms for trending, update the /stats counters and hand
+            # substantial articles to the summary workers in the same
+            # transaction; duplicates are stored and counted but not
+            # indexed or summarized again
+            new_rows = [dict(row, id=inserted[row["link"]]) for row in rows if row["link"] in inserted]
+            originals = [row for row in new_rows if not row.get("canonical_id")]
+            duplicates = len(new_rows) - len(originals)
+            store_bodies(db, new_rows)
+            trending_detector.index_articles(db, originals)
+            store_fingerprints(db, [row for row in originals if row["fingerprint"] is not None])
+            count_articles(db, new_rows)
+            enqueue_links(db, [row["link"] for row in originals if len(row["content"] or "") > MIN_CONTENT_LENGTH])
+        db.commit()
+        record_stage("db_write", time.perf_counter() - start, timings)
+        ARTICLES.inc(saved - duplicates, result="saved")
+        ARTICLES.inc(duplicates, result="duplicate")
+        if duplicates:
+            print(f"  🔗 Linked {duplicates} near-duplicate articles to their originals")
+        if saved:
+            notify_workers()
+            notify_events()
+            # Also retires the trending results cached in this process
+            data_changed()
+            if progress:
+                progress.add(articles_saved=saved, duplicates_linked=duplicates)
+        return saved
+    except Exception as e:
+        print(f"❌ Failed to save batch of {len(rows)} articles: {e}")
+        STAGE_ERRORS.inc(stage="db_write")
+        db.rollback()
+        if progress:
+            progress.batch_failed({row["feed_url"] for row in rows},
+                                  f"Failed to save batch of {len(rows)} articles: {e}")
+        return 0
+
+def save_articles(articles, batch_size=BATCH_SIZE, progress=None):
+    """Persist an iterable of articles in batches, returning how many were new.
+
+    Each batch is committed in its own transaction, so a crash partway
+    through keeps everything written before it.
+    """
     db = SessionLocal()
     saved_count = 0
+    batch = []
     
-    for art in articles:
-        try:
-            # Articles are already filtered for duplicates, so just save them
-            article = Article(
-                title=art["title"],
-                link=art["link"],
-                content=art["content"],
-                summary=art["summary"],
-                image_url=art["image_url"],
-                published=art["published"]
-            )
-            db.add(article)
-            db.commit()  # Commit each article individually
-            saved_count += 1
-        except Exception as e:
-            print(f"❌ Failed to process {art['link']}: {e}")
-            db.rollback()  # Rollback on error
-    
-    # Update last fetch time
-    if saved_count > 0:
-        try:
-            # Check if last_fetch record exists
-            last_fetch = db.query(Metadata).filter(Metadata.key == "last_fetch").first()
-            if last_fetch:
-                last_fetch.value = datetime.now(timezone.utc).isoformat()
-                last_fetch.updated_at = datetime.now(timezone.utc)
-            else:
-                last_fetch = Metadata(
-                    key="last_fetch",
-                    value=datetime.now(timezone.utc).isoformat()
-                )
-                db.add(last_fetch)
-            db.commit()
-        except Exception as e:
-            print(f"❌ Failed to update last fetch time: {e}")
-            db.rollback()
+    try:
+        for art in articles:
+            batch.append(art)
+            if len(batch) >= batch_size:
+                saved_count += _write_batch(db, batch, progress)
+                batch = []
+        if batch:
+            saved_count += _write_batch(db, batch, progress)
+    finally:
+        db.close()
     
     print(f"✅ Saved {saved_count} new articles")
-    db.close()
+    return saved_count
+
+def run_collection(batch_size=BATCH_SIZE, progress=None, feed_urls=None):
+    """Stream a collection run into the database, returning the number of new articles.
+
+    Polls ``feed_urls``, or every enabled feed when None, and reschedules
+    each of them from what it returned. A one-line JSON summary of the run (counts and time per stage) is
+    printed at the end; ``progress.summary()`` returns the same data.
+    """
+    progress = progress or CollectionProgress()
+    if feed_urls is None:
+        feed_urls = registered_feed_urls()
+    feed_states = {}
+    start = time.perf_counter()
+    try:
+        saved_count = save_articles(
+            iter_articles(feed_states=feed_states, progress=progress, feed_urls=feed_urls), batch_size, progress)
+        # Only remember feed validators once their entries are safely stored;
+        # feeds with a failed batch are fetched in full again next time
+        save_feed_states({url: state for url, state in feed_states.items() if url not in progress.unsaved_feeds})
+        per_feed = progress.to_dict()["per_feed"]
+        record_polls({url: per_feed.get(url, {}) for url in feed_urls})
+    except Exception:
+        COLLECTIONS.inc(result="failed")
+        raise
+    finally:
+        progress.finish(time.perf_counter() - start)
+    COLLECTIONS.inc(result="done")
+    print(f"📊 Collection summary: {json.dumps(progress.summary())}")
+    return saved_count
 
 # 5️⃣ Main execution
 if __name__ == "__main__":
     create_table()
-    articles = fetch_articles()
-    save_articles(articles)
+    run_collection()
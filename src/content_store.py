@@ -0,0 +1,119 @@
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import bindparam, func, select, text, update
+
+from .models import engine, SessionLocal, Article, ArticleBody, Metadata, compress_text, decompress_text
+
+# Characters kept inline for list views; one more is stored so readers can
+# tell whether the text was cut
+PREVIEW_LENGTH = 500
+
+# SQLite keeps article text zlib-compressed in article_bodies. PostgreSQL
+# already compresses large values (TOAST) and stores them out of line, so
+# the text stays in articles.content there and search can index it directly.
+COMPRESSED = engine.dialect.name == "sqlite"
+
+def make_preview(content: Optional[str]) -> str:
+    return (content or "")[:PREVIEW_LENGTH + 1]
+
+def card_columns() -> Dict:
+    """Columns behind each article card field; content is the stored preview"""
+    return {
+        "id": Article.id,
+        "title": Article.title,
+        "link": Article.link,
+        "content": Article.preview.label("content"),
+        "summary": Article.summary,
+        "image_url": Article.image_url,
+        "published": Article.published
+    }
+
+def article_card(article: Dict) -> Dict:
+    """Format a row of card fields for the API"""
+    if "content" in article:
+        content = article["content"] or ""
+        article["content"] = content[:PREVIEW_LENGTH] + "..." if len(content) > PREVIEW_LENGTH else content
+    if "summary" in article:
+        article["summary"] = article["summary"] or "No summary available"
+    if "published" in article:
+        article["published"] = article["published"].isoformat() if article["published"] else None
+    return article
+
+def inline_content(content: Optional[str]) -> Optional[str]:
+    """Value for articles.content: the text itself unless bodies are stored compressed"""
+    return None if COMPRESSED else content
+
+def store_bodies(db, rows: Iterable[Dict]):
+    """Store the full text of newly inserted articles (the caller commits).
+
+    Each row needs ``id`` and ``content``. Every article gets a body, even an
+    empty one, which is what puts it in the SQLite full-text index.
+    """
+    if not COMPRESSED:
+        return
+    values = [{
+        "article_id": row["id"],
+        "data": compress_text(row["content"]),
+        "length": len(row["content"] or "")
+    } for row in rows]
+    if values:
+        db.execute(ArticleBody.__table__.insert(), values)
+
+def load_contents(db, article_ids: List[int]) -> Dict[int, str]:
+    """Full text of the given articles, decompressed"""
+    if not article_ids:
+        return {}
+    if COMPRESSED:
+        rows = db.execute(
+            select(ArticleBody.article_id, ArticleBody.data).where(ArticleBody.article_id.in_(article_ids))
+        ).all()
+        return {article_id: decompress_text(data) for article_id, data in rows}
+    rows = db.execute(select(Article.id, Article.content).where(Article.id.in_(article_ids))).all()
+    return {article_id: content for article_id, content in rows}
+
+def load_content(db, article_id: int) -> Optional[str]:
+    return load_contents(db, [article_id]).get(article_id)
+
+def migrate_content(batch_size: int = 500):
+    """Move text stored inline in articles into compressed bodies (runs once per database).
+
+    Also fills in previews. On SQLite the file is vacuumed afterwards so the
+    freed pages are returned to the filesystem.
+    """
+    db = SessionLocal()
+    moved = 0
+    try:
+        if db.query(Metadata.id).filter(Metadata.key == "content_migrated").first() is not None:
+            return
+        table = Article.__table__
+        if COMPRESSED:
+            has_body = select(ArticleBody.article_id).where(ArticleBody.article_id == table.c.id).exists()
+            while True:
+                batch = db.execute(
+                    select(table.c.id, table.c.content).where(~has_body).order_by(table.c.id).limit(batch_size)
+                ).all()
+                if not batch:
+                    break
+                rows = [{"id": article_id, "content": content} for article_id, content in batch]
+                store_bodies(db, rows)
+                db.execute(
+                    update(table).where(table.c.id == bindparam("article_id"))
+                    .values(content=None, preview=bindparam("article_preview")),
+                    [{"article_id": row["id"], "article_preview": make_preview(row["content"])} for row in rows]
+                )
+                db.commit()
+                moved += len(rows)
+            if moved:
+                print(f"🗜️  Compressed the text of {moved} articles")
+        else:
+            db.execute(
+                update(table).where(table.c.preview.is_(None))
+                .values(preview=func.substr(table.c.content, 1, PREVIEW_LENGTH + 1))
+            )
+        db.add(Metadata(key="content_migrated", value="1"))
+        db.commit()
+    finally:
+        db.close()
+    if moved:
+        with engine.connect() as conn:
+            conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("VACUUM"))
@@ -0,0 +1,156 @@
+import hashlib
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import or_, select
+
+from .models import Article, ArticleFingerprint
+
+BANDS = 4
+BAND_BITS = 64 // BANDS
+SHINGLE_SIZE = 3
+
+# Articles whose fingerprints differ in at most this many of 64 bits are the
+# same story. Must stay below the number of bands so a match always shares
+# at least one band exactly.
+MAX_DISTANCE = int(os.getenv("DEDUP_MAX_DISTANCE", "3"))
+if not 0 <= MAX_DISTANCE < BANDS:
+    raise ValueError(f"DEDUP_MAX_DISTANCE must be between 0 and {BANDS - 1}, got {MAX_DISTANCE}: "
+                     f"the {BANDS}-band candidate search can miss matches further apart")
+# Only stories stored this recently are considered as originals
+DEDUP_WINDOW_DAYS = float(os.getenv("DEDUP_WINDOW_DAYS", "14"))
+# Shorter texts don't give a reliable fingerprint and are never matched
+MIN_WORDS = 50
+
+_WORD = re.compile(r"\w+")
+_MASK = (1 << 64) - 1
+
+def _word_hashes(words: List[str]) -> np.ndarray:
+    # Stable across processes, unlike hash()
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(word.encode(), digest_size=8).digest(), "little") for word in words),
+        dtype=np.uint64, count=len(words)
+    )
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer, so combined shingle hashes have well spread bits"""
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+def simhash(text: str) -> Optional[int]:
+    """64-bit SimHash over word 3-shingles, or None if the text is too short"""
+    words = _WORD.findall((text or "").lower())
+    if len(words) < MIN_WORDS:
+        return None
+    hashes = _word_hashes(words)
+    with np.errstate(over="ignore"):
+        shingles = hashes[:-2] * np.uint64(3) + hashes[1:-1] * np.uint64(5) + hashes[2:] * np.uint64(7)
+        shingles = _mix(shingles)
+    # Each bit of the fingerprint is the majority vote of that bit across shingles
+    bits = np.unpackbits(shingles.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    majority = bits.sum(axis=0) * 2 > len(shingles)
+    return int(np.packbits(majority, bitorder="little").view("<u8")[0])
+
+def bands(fingerprint: int) -> List[int]:
+    return [(fingerprint >> (BAND_BITS * i)) & ((1 << BAND_BITS) - 1) for i in range(BANDS)]
+
+def distance(a: int, b: int) -> int:
+    return ((a ^ b) & _MASK).bit_count()
+
+def _to_signed(value: int) -> int:
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+def _to_unsigned(value: int) -> int:
+    return value & _MASK
+
+def find_canonicals(db, fingerprints: Dict[str, int], window_days: float = DEDUP_WINDOW_DAYS) -> Dict[str, int]:
+    """Map each link to the id of a recent stored article it near-duplicates.
+
+    Candidates come from exact band matches through the band indexes, so the
+    cost depends on the number of candidates rather than the number of
+    stored fingerprints.
+    """
+    if not fingerprints:
+        return {}
+    fp = ArticleFingerprint.__table__.c
+    band_values = [set() for _ in range(BANDS)]
+    for fingerprint in fingerprints.values():
+        for i, value in enumerate(bands(fingerprint)):
+            band_values[i].add(value)
+    cutoff = datetime.now(timezone.utc) - timedelta(days=window_days)
+    candidates = db.execute(
+        select(fp.article_id, fp.simhash).where(
+            fp.published >= cutoff,
+            or_(*(fp[f"band{i}"].in_(values) for i, values in enumerate(band_values)))
+        )
+    ).all()
+
+    matches = {}
+    for link, fingerprint in fingerprints.items():
+        best = None
+        for article_id, stored in candidates:
+            d = distance(fingerprint, _to_unsigned(stored))
+            if d <= MAX_DISTANCE and (best is None or (d, article_id) < best):
+                best = (d, article_id)
+        if best is not None:
+            matches[link] = best[1]
+    return matches
+
+def store_fingerprints(db, rows: List[Dict]):
+    """Index fingerprints of newly stored canonical articles (the caller commits).
+
+    Each row needs ``id``, ``fingerprint`` and ``published``.
+    """
+    values = []
+    for row in rows:
+        values.append({
+            "article_id": row["id"],
+            "simhash": _to_signed(row["fingerprint"]),
+            "published": row["published"],
+            **{f"band{i}": value for i, value in enumerate(bands(row["fingerprint"]))}
+        })
+    if values:
+        db.execute(ArticleFingerprint.__table__.insert(), values)
+
+def link_duplicates(db, rows: List[Dict]) -> List[Dict]:
+    """Fingerprint a batch of new articles and mark near-duplicates.
+
+    Sets ``fingerprint`` on each row, and ``canonical_id`` (an existing
+    article) or ``canonical_link`` (an earlier row in the same batch) on
+    near-duplicates. Duplicates take over the original's summary if it has one.
+    """
+    for row in rows:
+        row["fingerprint"] = simhash(f"{row['title']}\n{row['content']}")
+    fingerprints = {row["link"]: row["fingerprint"] for row in rows if row["fingerprint"] is not None}
+    stored = find_canonicals(db, fingerprints)
+
+    batch_originals = []
+    for row in rows:
+        fingerprint = row["fingerprint"]
+        if fingerprint is None:
+            continue
+        if row["link"] in stored:
+            row["canonical_id"] = stored[row["link"]]
+            continue
+        for original in batch_originals:
+            if distance(fingerprint, original["fingerprint"]) <= MAX_DISTANCE:
+                row["canonical_link"] = original["link"]
+                break
+        else:
+            batch_originals.append(row)
+
+    canonical_ids = {row["canonical_id"] for row in rows if row.get("canonical_id")}
+    if canonical_ids:
+        summaries = dict(db.execute(
+            select(Article.id, Article.summary).where(Article.id.in_(canonical_ids), Article.summary.isnot(None))
+        ).all())
+        for row in rows:
+            if row.get("canonical_id") in summaries and not row["summary"]:
+                row["summary"] = summaries[row["canonical_id"]]
+    return rows
@@ -0,0 +1,177 @@
+import asyncio
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+from sqlalchemy import func
+
+from .content_store import article_card, card_columns
+from .http_cache import article_version
+from .models import SessionLocal, Article
+from .stats import get_stats
+
+# How often the publisher looks for changes made by other processes (the
+# scheduler); ingest in this process wakes it immediately
+POLL_INTERVAL = float(os.getenv("EVENTS_POLL_INTERVAL", "5"))
+# Comment line sent on idle streams so proxies keep the connection open
+HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT", "15"))
+# Messages buffered per client; a client that falls further behind is
+# disconnected and catches up from Last-Event-ID when it reconnects
+QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+# Articles per "articles" event
+MAX_ARTICLES = 100
+# Articles replayed to a reconnecting client before it is told to reload
+MAX_REPLAY = 1000
+
+_wakeup = threading.Event()
+
+def notify_events():
+    """Wake the publisher after new articles were committed in this process"""
+    _wakeup.set()
+
+def format_event(event: str, data, event_id: Optional[int] = None) -> str:
+    """Encode one server-sent event"""
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+def latest_article_id() -> int:
+    db = SessionLocal()
+    try:
+        return db.query(func.max(Article.id)).scalar() or 0
+    finally:
+        db.close()
+
+def articles_since(since_id: int, limit: int = MAX_ARTICLES) -> List[Dict]:
+    """Cards of the articles stored after ``since_id``, oldest first"""
+    db = SessionLocal()
+    try:
+        rows = db.query(*card_columns().values()).filter(Article.id > since_id).order_by(Article.id).limit(limit).all()
+    finally:
+        db.close()
+    return [article_card(row._asdict()) for row in rows]
+
+class EventBroker:
+    """In-process fan-out of pre-encoded events to every connected stream.
+
+    Each subscriber is an asyncio queue on its own event loop; publishing
+    from any thread encodes the event once and hands it to every loop.
+    """
+
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers = {}  # queue -> loop
+        self._lock = threading.Lock()
+
+    @property
+    def subscribers(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register a stream (call from its event loop)"""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers[queue] = asyncio.get_running_loop()
+        notify_events()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    def publish(self, event: str, data, event_id: Optional[int] = None):
+        message = format_event(event, data, event_id)
+        with self._lock:
+            subscribers = list(self._subscribers.items())
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, message)
+            except RuntimeError:  # The loop has closed
+                self.unsubscribe(queue)
+
+    def _offer(self, queue: asyncio.Queue, message: str):
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Too slow to keep up: drop what is buffered and end the stream
+            self.unsubscribe(queue)
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+event_broker = EventBroker()
+
+class EventPublisher:
+    """Background thread turning database changes into events.
+
+    Nothing is queried while no client is connected. With clients, one
+    check of the cached change marker per interval covers all of them;
+    only when it moved are the new articles and stats read, once, and
+    broadcast.
+    """
+
+    def __init__(self, broker: EventBroker = event_broker, poll_interval: float = POLL_INTERVAL):
+        self.broker = broker
+        self.poll_interval = poll_interval
+        self._last_id = None
+        self._version = None
+        self._stats = None
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="events", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        _wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+        self._thread = None
+
+    def _run(self):
+        while not self._stopped.is_set():
+            _wakeup.wait(self.poll_interval)
+            _wakeup.clear()
+            if self._stopped.is_set():
+                break
+            if not self.broker.subscribers:
+                # Start again from the newest article when someone connects
+                self._last_id = None
+                continue
+            try:
+                self.publish_changes()
+            except Exception as e:
+                print(f"❌ Failed to publish events: {e}")
+
+    def publish_changes(self):
+        version = article_version.get()
+        if self._last_id is None:
+            self._last_id = latest_article_id()
+            self._version = version
+            self._stats = get_stats()
+            return
+        if version == self._version:
+            return
+        self._version = version
+
+        while True:
+            articles = articles_since(self._last_id)
+            if articles:
+                self._last_id = articles[-1]["id"]
+                self.broker.publish("articles", {"articles": articles}, event_id=self._last_id)
+            if len(articles) < MAX_ARTICLES:
+                break
+
+        # Archiving also moves the marker; stats only go out when they differ
+        stats = get_stats()
+        if stats != self._stats:
+            self._stats = stats
+            self.broker.publish("stats", stats)
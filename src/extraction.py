@@ -0,0 +1,135 @@
+import multiprocessing
+import os
+import re
+import signal
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import lxml.html
+from lxml import etree
+from newspaper import Article as NewsArticle
+
+# HTML parsing is CPU-bound and holds the GIL, so it runs in worker
+# processes, one per core by default
+PARSE_WORKERS = int(os.getenv("COLLECTOR_PARSE_WORKERS", str(os.cpu_count() or 1)))
+# Seconds a single document may take to parse before it is given up on
+PARSE_TIMEOUT = float(os.getenv("COLLECTOR_PARSE_TIMEOUT", "20"))
+# Extra seconds without any finished parse before the workers are taken to be
+# stuck in C code (which the alarm can't interrupt) and replaced
+PARSE_STALL_GRACE = 10
+# Pages larger than this are not downloaded in full or parsed
+MAX_HTML_BYTES = int(os.getenv("COLLECTOR_MAX_HTML_BYTES", str(5 * 1024 * 1024)))
+
+# Embedded feed content at least this long (in characters of text) is taken
+# as the full article instead of downloading the page
+FEED_CONTENT_MIN_LENGTH = int(os.getenv("FEED_CONTENT_MIN_LENGTH", "1000"))
+
+# Endings that mark a teaser rather than a full article
+TRUNCATION_MARKERS = re.compile(r"(\.\.\.|…|\[…\]|\[\.\.\.\]|read more|continue reading|read the full \w+)\W*$", re.IGNORECASE)
+
+BLOCK_TAGS = ("p", "div", "br", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6",
+              "blockquote", "pre", "table", "tr", "section", "article", "figure", "hr")
+
+def html_to_text(html: str) -> str:
+    """Strip an HTML fragment to text, one paragraph per block element"""
+    try:
+        doc = lxml.html.fragment_fromstring(html, create_parent="div")
+    except (etree.ParserError, ValueError):
+        return ""
+    etree.strip_elements(doc, "script", "style", "noscript", "iframe", "figcaption", with_tail=False)
+    for element in doc.iter(*BLOCK_TAGS):
+        element.text = "\n" + (element.text or "")
+        element.tail = "\n" + (element.tail or "")
+    lines = (re.sub(r"\s+", " ", line).strip() for line in doc.text_content().split("\n"))
+    return "\n\n".join(line for line in lines if line)
+
+def feed_entry_text(entry, min_length: int = FEED_CONTENT_MIN_LENGTH) -> str:
+    """Full article text embedded in a feed entry (``content:encoded``), or "" if it looks incomplete"""
+    best = ""
+    for content in entry.get("content") or []:
+        value = content.get("value") or ""
+        if "html" in (content.get("type") or "text/html"):
+            value = html_to_text(value)
+        else:
+            value = value.strip()
+        if len(value) > len(best):
+            best = value
+    if len(best) < min_length or TRUNCATION_MARKERS.search(best):
+        return ""
+    return best
+
+class ParseTimeout(TimeoutError):
+    pass
+
+def _on_alarm(signum, frame):
+    raise ParseTimeout("parsing took too long")
+
+def parse_html(url: str, html: bytes, timeout: float = PARSE_TIMEOUT) -> str:
+    """Extract the article text from downloaded HTML (runs in a worker process).
+
+    ``html`` is the raw response body; newspaper detects the encoding itself,
+    so the parent never decodes or copies it.
+    """
+    use_alarm = timeout and hasattr(signal, "setitimer")
+    if use_alarm:
+        # Pool workers run tasks on their main thread, so the alarm can
+        # interrupt a parse that runs too long in Python code; a hang inside
+        # lxml's C code only ends when ExtractionPool.restart kills the worker
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        article = NewsArticle(url)
+        article.download(input_html=html)
+        article.parse()
+        return article.text.strip()
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+def _mp_context():
+    # Don't fork the collector's fetch threads into the workers
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+class ExtractionPool:
+    """Process pool that turns downloaded HTML into article text.
+
+    A worker that dies (a crash or OOM kill in the parser) breaks the whole
+    executor; the next submit starts a fresh one, and the parses that were
+    in flight fail with BrokenProcessPool.
+    """
+
+    def __init__(self, workers: int = PARSE_WORKERS, timeout: float = PARSE_TIMEOUT):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        # Longest wait for any parse to finish before the workers count as stuck
+        self.stall_timeout = timeout + PARSE_STALL_GRACE if timeout else None
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_mp_context())
+
+    def submit(self, url: str, html: bytes) -> Future:
+        """Parse ``html`` in a worker; the future raises ParseTimeout if it takes too long"""
+        try:
+            return self._executor.submit(parse_html, url, html, self.timeout)
+        except BrokenProcessPool:
+            print("⚠️  Extraction worker died, starting a new pool")
+            self.restart()
+            return self._executor.submit(parse_html, url, html, self.timeout)
+
+    def restart(self, kill: bool = False):
+        """Replace the executor; with ``kill``, terminate its workers first (failing their parses)"""
+        old = self._executor
+        if kill:
+            # ProcessPoolExecutor has no public way to stop a busy worker
+            for process in list(getattr(old, "_processes", {}).values()):
+                process.terminate()
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_mp_context())
+        old.shutdown(wait=False, cancel_futures=True)
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,359 @@
+import argparse
+import heapq
+import os
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from lxml import etree
+from sqlalchemy import or_
+
+from .fetcher import ALLOW_PRIVATE_HOSTS, is_public_address
+from .models import SessionLocal, FeedState, as_utc, dialect_insert
+
+# Polling interval for feeds without history, and the bounds the adaptive
+# interval stays within (seconds)
+FEED_DEFAULT_INTERVAL = float(os.getenv("FEED_DEFAULT_INTERVAL", "3600"))
+FEED_MIN_INTERVAL = float(os.getenv("FEED_MIN_INTERVAL", "300"))
+FEED_MAX_INTERVAL = float(os.getenv("FEED_MAX_INTERVAL", "86400"))
+# Longest wait before retrying a failing feed
+FEED_MAX_BACKOFF = float(os.getenv("FEED_MAX_BACKOFF", "86400"))
+# Each next poll time is moved by up to this share of the interval, so feeds
+# imported together don't stay in lockstep
+FEED_JITTER = float(os.getenv("FEED_JITTER", "0.1"))
+# Weight of the latest poll in the smoothed update rate
+RATE_SMOOTHING = 0.3
+# Feeds polled per collection cycle, and cycles allowed to run at once
+FEED_CYCLE_SIZE = int(os.getenv("FEED_CYCLE_SIZE", "50"))
+FEED_MAX_CYCLES = int(os.getenv("FEED_MAX_CYCLES", "2"))
+# How often the scheduler re-reads the registry for added or changed feeds
+FEED_REFRESH_SECONDS = float(os.getenv("FEED_REFRESH_SECONDS", "60"))
+
+def _jittered(seconds: float) -> timedelta:
+    return timedelta(seconds=seconds * random.uniform(1 - FEED_JITTER, 1 + FEED_JITTER))
+
+def check_feed_url(url: str) -> str:
+    """Return ``url`` if it is an http(s) URL on a public host, else raise ValueError.
+
+    Feeds are fetched from the server, so a registered URL must not reach
+    the server's own network. This rejects bad URLs up front; the Fetcher
+    enforces the same rule on every connection it makes.
+    """
+    parts = urlsplit(url.strip())
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"Not an http(s) URL: {url}")
+    if ALLOW_PRIVATE_HOSTS:
+        return url
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        addresses = socket.getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError) as e:
+        raise ValueError(f"Cannot resolve {parts.hostname}: {e}")
+    for *_, sockaddr in addresses:
+        if not is_public_address(sockaddr[0]):
+            raise ValueError(f"{parts.hostname} resolves to a non-public address ({sockaddr[0]})")
+    return url
+
+def register_feeds(feeds: Iterable[Tuple[str, Optional[str]]]) -> int:
+    """Add ``(url, title)`` pairs to the registry, returning how many were new.
+
+    Feeds already registered keep their state; a missing title is filled in.
+    """
+    rows = {url.strip(): title for url, title in feeds if url and url.strip()}
+    if not rows:
+        return 0
+    db = SessionLocal()
+    try:
+        existing = {
+            row.feed_url: row
+            for row in db.query(FeedState).filter(FeedState.feed_url.in_(list(rows))).all()
+        }
+        for url, title in rows.items():
+            if url in existing and title and not existing[url].title:
+                existing[url].title = title
+        new = [{"feed_url": url, "title": title, "enabled": 1, "failures": 0}
+               for url, title in rows.items() if url not in existing]
+        if new:
+            # Concurrent imports of the same feed are skipped, not errors
+            db.execute(dialect_insert(FeedState.__table__).on_conflict_do_nothing(index_elements=["feed_url"]), new)
+        db.commit()
+        return len(new)
+    finally:
+        db.close()
+
+def set_enabled(feed_url: str, enabled: bool) -> bool:
+    db = SessionLocal()
+    try:
+        row = db.query(FeedState).filter(FeedState.feed_url == feed_url).first()
+        if row is None:
+            return False
+        row.enabled = 1 if enabled else 0
+        if enabled:
+            row.next_poll_at = None
+        db.commit()
+        return True
+    finally:
+        db.close()
+
+def enabled_feed_urls() -> List[str]:
+    db = SessionLocal()
+    try:
+        rows = db.query(FeedState.feed_url).filter(
+            or_(FeedState.enabled.is_(None), FeedState.enabled == 1)
+        ).order_by(FeedState.id).all()
+        return [row.feed_url for row in rows]
+    finally:
+        db.close()
+
+def feed_schedule() -> List[Tuple[str, Optional[datetime]]]:
+    """``(url, next_poll_at)`` of every enabled feed; None means due now"""
+    db = SessionLocal()
+    try:
+        rows = db.query(FeedState.feed_url, FeedState.next_poll_at).filter(
+            or_(FeedState.enabled.is_(None), FeedState.enabled == 1)
+        ).all()
+        return [(row.feed_url, as_utc(row.next_poll_at)) for row in rows]
+    finally:
+        db.close()
+
+def list_feeds() -> List[Dict]:
+    db = SessionLocal()
+    try:
+        rows = db.query(FeedState).order_by(FeedState.id).all()
+        return [{
+            "url": row.feed_url,
+            "title": row.title,
+            "enabled": row.enabled != 0,
+            "poll_interval": row.poll_interval,
+            "update_rate": round(row.update_rate, 3) if row.update_rate is not None else None,
+            "next_poll_at": as_utc(row.next_poll_at).isoformat() if row.next_poll_at else None,
+            "last_polled_at": as_utc(row.last_polled_at).isoformat() if row.last_polled_at else None,
+            "failures": row.failures or 0,
+            "last_error": row.last_error
+        } for row in rows]
+    finally:
+        db.close()
+
+def next_interval(update_rate: Optional[float]) -> float:
+    """Seconds until the next poll: about one new entry's worth of time, within bounds"""
+    if update_rate is None:
+        return FEED_DEFAULT_INTERVAL
+    if update_rate <= 0:
+        return FEED_MAX_INTERVAL
+    return min(FEED_MAX_INTERVAL, max(FEED_MIN_INTERVAL, 3600 / update_rate))
+
+def record_polls(results: Dict[str, Dict], now: Optional[datetime] = None):
+    """Reschedule polled feeds from their outcome.
+
+    ``results`` maps each polled feed URL to its counts for the run:
+    ``new_entries`` and, when the poll failed, ``failed`` and ``error``.
+    Healthy feeds move towards their observed update rate; failing ones
+    back off exponentially.
+    """
+    if not results:
+        return
+    now = now or datetime.now(timezone.utc)
+    db = SessionLocal()
+    try:
+        rows = {
+            row.feed_url: row
+            for row in db.query(FeedState).filter(FeedState.feed_url.in_(list(results))).all()
+        }
+        for url, result in results.items():
+            row = rows.get(url)
+            if row is None:
+                row = FeedState(feed_url=url, enabled=1)
+                db.add(row)
+            if result.get("failed"):
+                row.failures = (row.failures or 0) + 1
+                row.last_error = (result.get("error") or "")[:500] or None
+                delay = min(FEED_MAX_BACKOFF, (row.poll_interval or FEED_DEFAULT_INTERVAL) * 2 ** row.failures)
+            else:
+                last_polled = as_utc(row.last_polled_at)
+                # The first poll returns the feed's backlog, which says nothing about its pace
+                if last_polled is not None:
+                    hours = max((now - last_polled).total_seconds() / 3600, 1 / 60)
+                    observed = result.get("new_entries", 0) / hours
+                    if row.update_rate is None:
+                        row.update_rate = observed
+                    else:
+                        row.update_rate = RATE_SMOOTHING * observed + (1 - RATE_SMOOTHING) * row.update_rate
+                # Slow down at most twofold per poll, so one quiet spell doesn't park a feed for a day
+                interval = next_interval(row.update_rate)
+                if row.poll_interval:
+                    interval = min(interval, row.poll_interval * 2)
+                row.poll_interval = interval
+                row.failures = 0
+                row.last_error = None
+                delay = row.poll_interval
+            row.last_polled_at = now
+            row.next_poll_at = now + _jittered(delay)
+        db.commit()
+    finally:
+        db.close()
+
+class FeedScheduler:
+    """Polls each feed when it is due, in cycles on background threads.
+
+    Due times live in the registry; the scheduler keeps them in a heap,
+    reloaded every ``refresh_seconds`` and after each cycle. Each ``tick``
+    starts a cycle with the feeds that are due (oldest first, at most
+    ``cycle_size``) unless ``max_cycles`` are already running, so a slow
+    cycle never stacks up behind itself and a feed is never polled twice
+    at once. ``run(feed_urls)`` does the polling; if it raises, every feed
+    in the cycle is counted as failed.
+    """
+
+    def __init__(self, run: Callable, cycle_size: int = FEED_CYCLE_SIZE, max_cycles: int = FEED_MAX_CYCLES,
+                 refresh_seconds: float = FEED_REFRESH_SECONDS):
+        self._run = run
+        self.cycle_size = max(1, cycle_size)
+        self.refresh_seconds = refresh_seconds
+        self._cycles = threading.BoundedSemaphore(max(1, max_cycles))
+        self._heap = []  # (due timestamp, url)
+        self._in_flight = set()
+        self._refreshed_at = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+    def refresh(self):
+        now = time.time()
+        heap = [(due.timestamp() if due else now, url) for url, due in feed_schedule()]
+        heapq.heapify(heap)
+        with self._lock:
+            self._heap = heap
+            self._refreshed_at = time.monotonic()
+
+    def tick(self) -> int:
+        """Start a cycle if feeds are due and one may run, returning how many feeds it polls"""
+        if self._refreshed_at is None or time.monotonic() - self._refreshed_at >= self.refresh_seconds:
+            self.refresh()
+        if not self._cycles.acquire(blocking=False):
+            return 0
+        now = time.time()
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now and len(due) < self.cycle_size:
+                _, url = heapq.heappop(self._heap)
+                if url not in self._in_flight:
+                    due.append(url)
+            self._in_flight.update(due)
+        if not due:
+            self._cycles.release()
+            return 0
+        threading.Thread(target=self._cycle, args=(due,), name="feed-cycle", daemon=True).start()
+        return len(due)
+
+    def _cycle(self, feed_urls: List[str]):
+        try:
+            self._run(feed_urls)
+        except Exception as e:
+            print(f"❌ Collection cycle for {len(feed_urls)} feeds failed: {e}")
+            try:
+                record_polls({url: {"failed": 1, "error": str(e)} for url in feed_urls})
+            except Exception as e:
+                print(f"❌ Failed to reschedule feeds: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.difference_update(feed_urls)
+                # Pick up the new due times on the next tick
+                self._refreshed_at = None
+            self._cycles.release()
+            self._wakeup.set()
+
+    def wait(self, timeout: float):
+        """Sleep until the next feed is due, a cycle ends or ``timeout`` passes"""
+        with self._lock:
+            due = self._heap[0][0] if self._heap else None
+        delay = timeout if due is None else min(timeout, due - time.time())
+        self._wakeup.wait(max(delay, 1))
+        self._wakeup.clear()
+
+    @property
+    def running(self) -> int:
+        with self._lock:
+            return len(self._in_flight)
+
+def parse_opml(data: bytes) -> List[Tuple[str, Optional[str]]]:
+    """``(url, title)`` of every feed outline in an OPML document, folders included"""
+    parser = etree.XMLParser(resolve_entities=False, no_network=True, huge_tree=False)
+    root = etree.fromstring(data, parser)
+    # OPML never needs a DTD; refusing one rules out entity tricks in uploads
+    if root.getroottree().docinfo.doctype:
+        raise ValueError("OPML documents with a DOCTYPE are not accepted")
+    feeds = []
+    for outline in root.iter("outline"):
+        url = outline.get("xmlUrl") or outline.get("xmlurl")
+        if url:
+            feeds.append((url.strip(), outline.get("title") or outline.get("text")))
+    return feeds
+
+def import_opml(data: bytes) -> Dict:
+    """Register the feeds in an OPML document; URLs failing check_feed_url are listed, not added"""
+    feeds = parse_opml(data)
+    accepted, rejected = [], []
+    for url, title in feeds:
+        try:
+            accepted.append((check_feed_url(url), title))
+        except ValueError as e:
+            rejected.append(str(e))
+    added = register_feeds(accepted)
+    return {"feeds": len(feeds), "added": added, "rejected": rejected}
+
+def export_opml() -> bytes:
+    root = etree.Element("opml", version="2.0")
+    etree.SubElement(etree.SubElement(root, "head"), "title").text = "TechHub feeds"
+    body = etree.SubElement(root, "body")
+    for feed in list_feeds():
+        attributes = {"type": "rss", "xmlUrl": feed["url"], "text": feed["title"] or feed["url"]}
+        if feed["title"]:
+            attributes["title"] = feed["title"]
+        etree.SubElement(body, "outline", **attributes)
+    return etree.tostring(root, xml_declaration=True, encoding="UTF-8", pretty_print=True)
+
+def main():
+    from .models import init_db
+
+    parser = argparse.ArgumentParser(description='Manage the feed registry')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help='Show registered feeds and their schedule')
+    add = commands.add_parser('add', help='Register a feed')
+    add.add_argument('url')
+    add.add_argument('--title')
+    for name in ('enable', 'disable'):
+        commands.add_parser(name, help=f'{name.capitalize()} a registered feed').add_argument('url')
+    commands.add_parser('import', help='Register every feed in an OPML file').add_argument('path')
+    commands.add_parser('export', help='Print the registry as OPML')
+    args = parser.parse_args()
+
+    init_db()
+    if args.command == 'list':
+        for feed in list_feeds():
+            state = "on " if feed["enabled"] else "off"
+            interval = f"{feed['poll_interval'] / 60:.0f}m" if feed["poll_interval"] else "-"
+            print(f"{state} {interval:>6} next {feed['next_poll_at'] or 'now'}  {feed['url']}")
+    elif args.command == 'add':
+        try:
+            check_feed_url(args.url)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        print("✅ Added" if register_feeds([(args.url, args.title)]) else "Already registered")
+    elif args.command in ('enable', 'disable'):
+        if not set_enabled(args.url, args.command == 'enable'):
+            print(f"❌ Not registered: {args.url}")
+    elif args.command == 'import':
+        with open(args.path, 'rb') as f:
+            result = import_opml(f.read())
+        print(f"✅ Imported {result['added']} new feeds ({result['feeds']} in the file)")
+        for reason in result["rejected"]:
+            print(f"  ❌ Skipped: {reason}")
+    elif args.command == 'export':
+        print(export_opml().decode())
+
+if __name__ == "__main__":
+    main()
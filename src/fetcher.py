@@ -0,0 +1,244 @@
+import ipaddress
+import os
+import queue
+import socket
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+from urllib3.util.connection import create_connection
+
+# SSL verification is disabled for development (see fetch_articles), so keep the
+# per-request warning out of the collector output
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+USER_AGENT = "Mozilla/5.0"
+
+# Global cap on in-flight requests and per-host cap so one slow site can't
+# monopolise the pool or get hammered with parallel requests
+MAX_WORKERS = int(os.getenv("COLLECTOR_MAX_WORKERS", "16"))
+MAX_PER_HOST = int(os.getenv("COLLECTOR_MAX_PER_HOST", "4"))
+REQUEST_TIMEOUT = float(os.getenv("COLLECTOR_TIMEOUT", "10"))
+# Set to 1 to allow feeds on loopback, private and link-local addresses
+# (intranet feeds, local testing)
+ALLOW_PRIVATE_HOSTS = os.getenv("FEED_ALLOW_PRIVATE_HOSTS", "0") == "1"
+
+
+def host_of(url: str) -> str:
+    """Return the lower-cased network location of a URL"""
+    return urlsplit(url).netloc.lower()
+
+
+def is_public_address(address: str) -> bool:
+    """Whether an IP address is globally routable (not loopback, private, link-local, ...)"""
+    ip = ipaddress.ip_address(address.split("%")[0])
+    ip = getattr(ip, "ipv4_mapped", None) or ip
+    return ip.is_global
+
+class _PublicOnly:
+    """Connection mixin that only connects to public addresses.
+
+    The host is resolved and checked here, and the socket goes to the
+    address that was checked, so every redirect hop is covered and a DNS
+    answer can't change between the check and the connect.
+    """
+
+    def _new_conn(self):
+        try:
+            addresses = socket.getaddrinfo(self._dns_host, self.port, type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        for *_, sockaddr in addresses:
+            if not is_public_address(sockaddr[0]):
+                raise NewConnectionError(self, f"Refusing to connect to {self.host}: non-public address {sockaddr[0]}")
+        error = None
+        for *_, sockaddr in addresses:
+            try:
+                return create_connection((sockaddr[0], self.port), self.timeout,
+                                         source_address=self.source_address, socket_options=self.socket_options)
+            except socket.timeout:
+                error = ConnectTimeoutError(self, f"Connection to {self.host} timed out. (connect timeout={self.timeout})")
+            except OSError as e:
+                error = NewConnectionError(self, f"Failed to establish a new connection: {e}")
+        raise error
+
+class _PublicHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = type("PublicHTTPConnection", (_PublicOnly, HTTPConnection), {})
+
+class _PublicHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = type("PublicHTTPSConnection", (_PublicOnly, HTTPSConnection), {})
+
+class PublicHostAdapter(HTTPAdapter):
+    """HTTPAdapter that only connects to public addresses"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _PublicHTTPConnectionPool,
+            "https": _PublicHTTPSConnectionPool,
+        }
+
+class Fetcher:
+    """Bounded thread pool over one keep-alive requests.Session.
+
+    Work is grouped per host and each host gets at most ``max_per_host``
+    lanes, so a run takes roughly as long as its slowest host rather than
+    the sum of all requests. Unless ``allow_private_hosts`` is set, only
+    public addresses are connected to, redirects included.
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS, max_per_host: int = MAX_PER_HOST,
+                 timeout: float = REQUEST_TIMEOUT, allow_private_hosts: bool = ALLOW_PRIVATE_HOSTS):
+        self.max_workers = max(1, max_workers)
+        self.max_per_host = max(1, max_per_host)
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": USER_AGENT})
+        # One connection pool per host, sized to the per-host lane count
+        adapter_class = HTTPAdapter if allow_private_hosts else PublicHostAdapter
+        adapter = adapter_class(pool_connections=self.max_workers, pool_maxsize=self.max_per_host)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fetch")
+        self._host_locks = defaultdict(lambda: threading.BoundedSemaphore(self.max_per_host))
+        self._host_locks_guard = threading.Lock()
+        # Work handed in one item at a time by submit() runs on its own
+        # threads, so it never waits behind map_by_host lanes
+        self._submit_executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fetch-submit")
+        self._queued = defaultdict(deque)
+        self._lanes = defaultdict(int)
+        self._lanes_guard = threading.Lock()
+
+    def _host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        with self._host_locks_guard:
+            return self._host_locks[host_of(url)]
+
+    def get(self, url: str, headers: Optional[dict] = None) -> requests.Response:
+        """GET a URL through the shared session, honouring the per-host cap"""
+        with self._host_semaphore(url):
+            return self.session.get(url, headers=headers, timeout=self.timeout,
+                                    verify=False)  # Disable SSL verification for development
+
+    def download(self, url: str, max_bytes: int, headers: Optional[dict] = None) -> bytes:
+        """GET a URL and return the raw body, refusing bodies larger than ``max_bytes``"""
+        with self._host_semaphore(url):
+            with self.session.get(url, headers=headers, timeout=self.timeout, stream=True,
+                                  verify=False) as response:  # Disable SSL verification for development
+                response.raise_for_status()
+                declared = response.headers.get("Content-Length")
+                if declared and declared.isdigit() and int(declared) > max_bytes:
+                    raise ValueError(f"response is {declared} bytes, limit is {max_bytes}")
+                # One read straight into a bytes object, stopping just past the limit
+                body = response.raw.read(max_bytes + 1, decode_content=True)
+                if len(body) > max_bytes:
+                    raise ValueError(f"response exceeds {max_bytes} bytes")
+                return body
+
+    def map_by_host(self, fn: Callable, items: Iterable,
+                    url_of: Callable = lambda item: item,
+                    max_pending: int = 0) -> Iterator[Tuple[object, object, Optional[Exception]]]:
+        """Run ``fn`` over ``items`` concurrently, yielding ``(item, result, error)`` as each finishes.
+
+        Workers hold back once ``max_pending`` results are waiting to be
+        consumed (default: twice the worker count), which keeps memory flat
+        when the consumer is slower than the network.
+        """
+        per_host = defaultdict(deque)
+        total = 0
+        for item in items:
+            per_host[host_of(url_of(item))].append(item)
+            total += 1
+        if not total:
+            return
+
+        results = queue.Queue(maxsize=max_pending or 2 * self.max_workers)
+        stopped = threading.Event()
+
+        def put(result):
+            while not stopped.is_set():
+                try:
+                    results.put(result, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def lane(pending: deque):
+            while not stopped.is_set():
+                try:
+                    item = pending.popleft()
+                except IndexError:
+                    return
+                try:
+                    put((item, fn(item), None))
+                except Exception as e:
+                    put((item, None, e))
+
+        for pending in per_host.values():
+            for _ in range(min(self.max_per_host, len(pending))):
+                self._executor.submit(lane, pending)
+
+        try:
+            for _ in range(total):
+                yield results.get()
+        finally:
+            # Release any lanes still waiting if the consumer stopped early
+            stopped.set()
+
+    def submit(self, fn: Callable, url: str, *args) -> Future:
+        """Run ``fn(*args)`` for a request to ``url`` and return its future.
+
+        Like map_by_host, but for work that arrives gradually: each host has
+        at most ``max_per_host`` lanes, taking its items in submission order.
+        """
+        future = Future()
+        host = host_of(url)
+        with self._lanes_guard:
+            self._queued[host].append((future, fn, args))
+            if self._lanes[host] >= self.max_per_host:
+                return future
+            self._lanes[host] += 1
+        self._submit_executor.submit(self._lane, host)
+        return future
+
+    def _lane(self, host: str):
+        while True:
+            with self._lanes_guard:
+                pending = self._queued[host]
+                if not pending:
+                    self._lanes[host] -= 1
+                    if not self._lanes[host]:
+                        del self._lanes[host], self._queued[host]
+                    return
+                future, fn, args = pending.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._lanes_guard:
+            for pending in self._queued.values():
+                for future, _, _ in pending:
+                    future.cancel()
+                pending.clear()
+        self._submit_executor.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
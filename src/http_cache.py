@@ -0,0 +1,134 @@
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import HTTPException, Request, Response
+
+from .models import SessionLocal, Metadata, as_utc
+
+# How long the API trusts its copy of the last-change marker before reading
+# it again; writes made in this process invalidate it immediately
+VALIDATOR_TTL = float(os.getenv("HTTP_VALIDATOR_TTL", "5"))
+
+# Clients may store responses but must revalidate them on every use
+DATA_CACHE_CONTROL = "no-cache"
+
+class DataVersion:
+    """Cached copy of when the data an endpoint shows last changed.
+
+    The markers are Metadata rows, and the newest ``updated_at`` among
+    ``keys`` is the version. Ingest sets ``last_fetch`` (its value and
+    ``updated_at``); retention bumps its ``updated_at``; summary workers
+    set ``last_summary``.
+    """
+
+    def __init__(self, keys=("last_fetch",), ttl: float = VALIDATOR_TTL):
+        self.keys = tuple(keys)
+        self.ttl = ttl
+        self._value = None
+        self._expires = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[datetime]:
+        with self._lock:
+            if time.monotonic() < self._expires:
+                return self._value
+        db = SessionLocal()
+        try:
+            rows = db.query(Metadata.updated_at).filter(Metadata.key.in_(self.keys)).all()
+        finally:
+            db.close()
+        value = max((as_utc(row.updated_at) for row in rows if row.updated_at is not None), default=None)
+        with self._lock:
+            self._value = value
+            self._expires = time.monotonic() + self.ttl
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._expires = 0.0
+
+# Which articles are stored: counts, listings without summaries
+article_version = DataVersion(("last_fetch",))
+# Everything shown, summaries included
+data_version = DataVersion(("last_fetch", "last_summary"))
+
+def data_changed(summaries_only: bool = False):
+    """Re-read the markers on next use after this process changed them"""
+    data_version.invalidate()
+    if not summaries_only:
+        article_version.invalidate()
+
+def _not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip() for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags or etag.removeprefix("W/") in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return last_modified.replace(microsecond=0) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def check_not_modified(request: Request, response: Response, changed_at: Optional[datetime]):
+    """Set the validators for data last changed at ``changed_at``; raise a 304 when the client has it"""
+    response.headers["Cache-Control"] = DATA_CACHE_CONTROL
+    if changed_at is None:
+        return
+
+    # The date is part of the tag so day-based counts roll over at midnight
+    today = datetime.now(timezone.utc).date().isoformat()
+    digest = hashlib.sha1(f"{changed_at.isoformat()}|{today}".encode()).hexdigest()[:16]
+    # Weak, because the compressed and plain bodies share the tag
+    etag = f'W/"{digest}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(changed_at.astimezone(timezone.utc), usegmt=True),
+        "Cache-Control": DATA_CACHE_CONTROL
+    }
+    if _not_modified(request, etag, changed_at):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+def conditional_get_for(version: DataVersion):
+    """Dependency for read endpoints: answer 304 before any query runs when ``version`` is unchanged"""
+    def conditional_get(request: Request, response: Response):
+        check_not_modified(request, response, version.get())
+    return conditional_get
+
+conditional_get = conditional_get_for(data_version)
+
+class StaticPage:
+    """A static file held in memory with a content-hash ETag"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.body = None
+        self.etag = None
+
+    def load(self) -> Optional[bytes]:
+        with self._lock:
+            if not self._loaded:
+                if os.path.exists(self.path):
+                    with open(self.path, "rb") as f:
+                        self.body = f.read()
+                    self.etag = f'"{hashlib.sha1(self.body).hexdigest()[:16]}"'
+                self._loaded = True
+            return self.body
+
+    def response(self, request: Request, media_type: str = "text/html") -> Optional[Response]:
+        if self.load() is None:
+            return None
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if_none_match = request.headers.get("if-none-match", "")
+        if self.etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}:
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type=media_type, headers=headers)
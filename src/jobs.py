@@ -0,0 +1,84 @@
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, Optional, Tuple
+
+from .collector import CollectionProgress, run_collection
+
+# Finished jobs kept around so clients can still read their outcome
+JOB_HISTORY = int(os.getenv("JOB_HISTORY", "20"))
+
+class CollectionJob:
+    """One background collection run and its live progress"""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = "queued"
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at = None
+        self.finished_at = None
+        self.progress = CollectionProgress()
+        self.error = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error,
+            **self.progress.to_dict()
+        }
+
+class JobManager:
+    """Runs collection jobs on a background thread, one at a time.
+
+    Asking for a refresh while a job is queued or running returns that job
+    instead of starting a parallel collection.
+    """
+
+    def __init__(self, run: Callable = run_collection, history: int = JOB_HISTORY):
+        self._run = run
+        self.history = max(1, history)
+        self._jobs = OrderedDict()
+        self._current = None
+        self._lock = threading.Lock()
+
+    def submit(self) -> Tuple[CollectionJob, bool]:
+        """Start a collection, returning ``(job, created)``; ``created`` is False when coalesced"""
+        with self._lock:
+            if self._current is not None and self._current.active:
+                return self._current, False
+            job = CollectionJob()
+            self._current = job
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.history:
+                self._jobs.popitem(last=False)
+        threading.Thread(target=self._execute, args=(job,), name=f"collect-{job.id[:8]}", daemon=True).start()
+        return job, True
+
+    def get(self, job_id: str) -> Optional[CollectionJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _execute(self, job: CollectionJob):
+        job.status = "running"
+        job.started_at = datetime.now(timezone.utc)
+        try:
+            self._run(progress=job.progress)
+            job.status = "done"
+        except Exception as e:
+            print(f"❌ Collection job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+
+collection_jobs = JobManager()
@@ -1,15 +1,45 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
-from .models import SessionLocal, Article, init_db
-from .summarizer import summarize_with_ollama, get_simple_summary
-from .simple_trending import get_trending_topics, trending_detector
+from sqlalchemy import tuple_
+from .models import SessionLocal, Article, as_utc, init_db
+from .summary_cache import summarize_cached
+from .simple_trending import trending_detector
+from .search import search_articles
+from .stats import get_stats as get_stats_payload
+from .content_store import article_card, card_columns
+from .retention import load_article_text
+from .compression import CompressionMiddleware
+from .http_cache import StaticPage, article_version, check_not_modified, conditional_get, conditional_get_for
+from .metrics import CONTENT_TYPE, MetricsMiddleware, registry
+from .summary_queue import SummaryWorkerPool
+from .events import HEARTBEAT_SECONDS, MAX_ARTICLES, MAX_REPLAY, EventPublisher, articles_since, event_broker, format_event
+from contextlib import asynccontextmanager
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime, timezone
 from typing import List, Optional
+import asyncio
 import os
 
-app = FastAPI(title="Global News Tracker", version="1.0.0")
+# The scheduler normally runs the summary workers; set this to also run them
+# inside the API process (e.g. when there is no scheduler service)
+SUMMARY_WORKERS_IN_API = os.getenv("SUMMARY_WORKERS_IN_API", "0") == "1"
+
+event_publisher = EventPublisher()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    summary_workers = SummaryWorkerPool() if SUMMARY_WORKERS_IN_API else None
+    if summary_workers:
+        summary_workers.start()
+    event_publisher.start()
+    yield
+    event_publisher.stop()
+    if summary_workers:
+        summary_workers.stop()
+
+app = FastAPI(title="Global News Tracker", version="1.0.0", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -18,7 +48,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified"],
 )
+app.add_middleware(CompressionMiddleware, minimum_size=500)
+# Outermost, so latency includes compression
+app.add_middleware(MetricsMiddleware)
 
 # Initialize database
 init_db()
@@ -27,36 +61,104 @@ init_db()
 if os.path.exists("static"):
     app.mount("/static", StaticFiles(directory="static"), name="static")
 
+index_page = StaticPage("static/index.html")
+
 @app.get("/")
-async def read_root():
-    """Serve the main frontend page"""
-    if os.path.exists("static/index.html"):
-        with open("static/index.html", "r") as f:
-            return HTMLResponse(content=f.read())
+async def read_root(request: Request):
+    """Serve the main frontend page (read from disk once)"""
+    page = index_page.response(request)
+    if page is not None:
+        return page
     return {"message": "Global News Tracker API", "docs": "/docs"}
 
-@app.get("/articles")
-def get_articles(limit: int = 50, offset: int = 0):
-    """Get articles with pagination"""
+# Fields a client may request from GET /articles
+ARTICLE_FIELDS = ("id", "title", "link", "content", "summary", "image_url", "published")
+
+def parse_cursor(before: str):
+    """Parse a ``<published>,<id>`` keyset cursor"""
+    try:
+        published, article_id = before.rsplit(",", 1)
+        return as_utc(datetime.fromisoformat(published)).astimezone(timezone.utc), int(article_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor, expected before=<published>,<id>")
+
+def make_cursor(article: dict) -> Optional[str]:
+    """Cursor for the page after ``article``"""
+    if article.get("published") is None or article.get("id") is None:
+        return None
+    return f"{article['published']},{article['id']}"
+
+@app.get("/articles", dependencies=[Depends(conditional_get)])
+def get_articles(response: Response, limit: int = Query(50, ge=1, le=100), offset: int = Query(0, ge=0),
+                 before: Optional[str] = None, fields: Optional[str] = None,
+                 since_id: Optional[int] = None):
+    """Get articles with pagination.
+
+    Pass ``before=<published>,<id>`` (the ``X-Next-Cursor`` header of the
+    previous page) for keyset pagination; ``offset`` is kept for older
+    clients. ``since_id`` instead returns only articles stored after that
+    id, oldest first, with ``X-Next-Since-Id`` set when more remain.
+    ``fields`` picks a comma-separated subset of card fields. Content is
+    always the stored preview, never the full body.
+    """
+    selected = ARTICLE_FIELDS
+    if fields:
+        selected = tuple(field for field in ARTICLE_FIELDS if field in {f.strip() for f in fields.split(",")})
+        if not selected:
+            raise HTTPException(status_code=400, detail=f"fields must be a subset of {', '.join(ARTICLE_FIELDS)}")
+    
+    # Only the requested columns are read, plus the sort key for the next cursor
+    columns = card_columns()
     db = SessionLocal()
-    articles = db.query(Article).order_by(Article.published.desc()).offset(offset).limit(limit).all()
-    db.close()
+    try:
+        wanted = set(selected) | {"id", "published"}
+        # Articles past the retention window are only served by id
+        query = db.query(*(column for field, column in columns.items() if field in wanted)).filter(Article.archived_at.is_(None))
+        if since_id is not None:
+            query = query.filter(Article.id > since_id).order_by(Article.id)
+        else:
+            query = query.order_by(Article.published.desc(), Article.id.desc())
+            if before:
+                query = query.filter(tuple_(Article.published, Article.id) < tuple_(*parse_cursor(before)))
+            elif offset:
+                query = query.offset(offset)
+        rows = query.limit(limit).all()
+    finally:
+        db.close()
     
-    return [{
-        "id": a.id,
-        "title": a.title, 
-        "link": a.link, 
-        "content": a.content[:500] + "..." if len(a.content) > 500 else a.content,
-        "summary": a.summary or "No summary available",
-        "image_url": a.image_url,
-        "published": a.published.isoformat() if a.published else None
-    } for a in articles]
-
-@app.get("/articles/{article_id}")
+    articles = [article_card(a._asdict()) for a in rows]
+    
+    if articles and len(articles) == limit:
+        if since_id is not None:
+            response.headers["X-Next-Since-Id"] = str(articles[-1]["id"])
+        else:
+            cursor = make_cursor(articles[-1])
+            if cursor:
+                response.headers["X-Next-Cursor"] = cursor
+    return [{field: article[field] for field in selected} for article in articles]
+
+@app.get("/search", dependencies=[Depends(conditional_get)])
+def search(response: Response, q: str, limit: int = Query(20, ge=1, le=100), before: Optional[str] = None):
+    """Full-text search over title, summary and content, best matches first.
+
+    Results carry a highlighted ``snippet``; pass the ``X-Next-Cursor``
+    header back as ``before`` for the next page.
+    """
+    try:
+        results, cursor = search_articles(q, limit, before)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
+    return results
+
+@app.get("/articles/{article_id}", dependencies=[Depends(conditional_get)])
 def get_article(article_id: int):
     """Get a specific article by ID"""
     db = SessionLocal()
     article = db.query(Article).filter(Article.id == article_id).first()
+    # The full body is only decompressed here, not for list views
+    content, summary = load_article_text(db, article) if article else (None, None)
     db.close()
     
     if not article:
@@ -66,9 +168,11 @@ def get_article(article_id: int):
         "id": article.id,
         "title": article.title,
         "link": article.link,
-        "content": article.content,
-        "summary": article.summary or "No summary available",
-        "published": article.published.isoformat() if article.published else None
+        "content": content,
+        "summary": summary or "No summary available",
+        "published": article.published.isoformat() if article.published else None,
+        "canonical_id": article.canonical_id,
+        "archived": article.archived_at is not None
     }
 
 @app.get("/summarize/{article_id}")
@@ -76,12 +180,13 @@ def summarize_article(article_id: int):
     """Summarize a specific article"""
     db = SessionLocal()
     article = db.query(Article).filter(Article.id == article_id).first()
+    content, _ = load_article_text(db, article) if article else (None, None)
     db.close()
     
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
     
-    summary = summarize_with_ollama(article.content)
+    summary = summarize_cached(content)
     return {
         "id": article.id,
         "title": article.title,
@@ -89,55 +194,136 @@ def summarize_article(article_id: int):
     }
 
 @app.get("/trending")
-def get_trending(hours: int = 168):  # Default to 7 days (168 hours)
-    """Get trending news articles from recent articles"""
+def get_trending(request: Request, response: Response, hours: int = 168):  # Default to 7 days (168 hours)
+    """Get trending news articles from recent articles.
+
+    While a recompute runs after new data arrives, the previous result is
+    served with the validators of the data it was computed from.
+    """
     try:
-        trending = trending_detector.get_trending_news(hours, 10)
-        return {"trending_news": trending, "hours": hours}
+        trending, version = trending_detector.get_trending_news_versioned(hours, 10)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting trending news: {str(e)}")
+    check_not_modified(request, response, version)
+    return {"trending_news": trending, "hours": hours}
 
 @app.get("/trending-topics")
-def get_trending_topics_endpoint(hours: int = 24):
+def get_trending_topics_endpoint(request: Request, response: Response, hours: int = 24):
     """Get trending topics (legacy endpoint)"""
     try:
-        trending = get_trending_topics(hours)
-        return {"trending_topics": trending, "hours": hours}
+        trending, version = trending_detector.get_trending_news_versioned(hours, 10)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting trending topics: {str(e)}")
+    check_not_modified(request, response, version)
+    return {"trending_topics": trending, "hours": hours}
 
 # Removed timeline endpoint for now - can be added later
 
-@app.get("/stats")
-def get_stats():
-    """Get basic statistics about the news database"""
-    from .models import Metadata
-    
-    db = SessionLocal()
-    total_articles = db.query(Article).count()
-    recent_articles = db.query(Article).filter(
-        Article.published >= datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
-    ).count()
-    
-    # Get the actual last fetch time
-    last_fetch_record = db.query(Metadata).filter(Metadata.key == "last_fetch").first()
-    last_updated = last_fetch_record.value if last_fetch_record else datetime.now(timezone.utc).isoformat()
-    
-    db.close()
-    
+# Counts don't change when summaries are stored
+@app.get("/stats", dependencies=[Depends(conditional_get_for(article_version))])
+def get_stats(days: int = Query(7, ge=1, le=366)):
+    """Get basic statistics about the news database.
+
+    Counts come from the counters maintained at ingest, so this is a couple
+    of key lookups however many articles are stored.
+    """
+    return get_stats_payload(days)
+
+@app.get("/events")
+async def events(since_id: Optional[int] = None, last_event_id: Optional[str] = Header(None)):
+    """Server-sent events: ``articles`` with the cards of newly stored
+    articles and ``stats`` with the /stats payload when it changes.
+
+    Articles after ``since_id`` (or the ``Last-Event-ID`` of a reconnecting
+    EventSource) are sent first. A ``reload`` event means too much was
+    missed and the client should fetch /articles again.
+    """
+    if last_event_id and last_event_id.isdigit():
+        since_id = int(last_event_id)
+    queue = event_broker.subscribe()
+
+    async def stream():
+        try:
+            yield "retry: 5000\n\n"
+            if since_id is not None:
+                replayed = 0
+                last_id = since_id
+                while True:
+                    articles = await run_in_threadpool(articles_since, last_id)
+                    if articles:
+                        last_id = articles[-1]["id"]
+                        replayed += len(articles)
+                        yield format_event("articles", {"articles": articles}, event_id=last_id)
+                    if len(articles) < MAX_ARTICLES:
+                        break
+                    if replayed >= MAX_REPLAY:
+                        yield format_event("reload", {})
+                        return
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if message is None:
+                    return
+                yield message
+        finally:
+            event_broker.unsubscribe(queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics for this process: stage timings, counters and request latency"""
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+@app.post("/refresh", status_code=202)
+def refresh_news(response: Response):
+    """Start a background news collection and return its job.
+
+    If a collection is already running, that job is returned instead of
+    starting another one. Poll ``GET /jobs/{id}`` for progress.
+    """
+    from .jobs import collection_jobs
+    job, created = collection_jobs.submit()
+    response.headers["Location"] = f"/jobs/{job.id}"
     return {
-        "total_articles": total_articles,
-        "articles_today": recent_articles,
-        "last_updated": last_updated
+        "job_id": job.id,
+        "status": job.status,
+        "coalesced": not created,
+        "message": "Refresh started" if created else "Refresh already in progress"
     }
 
-@app.post("/refresh")
-def refresh_news():
-    """Manually trigger news collection"""
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Get the status and progress of a collection job"""
+    from .jobs import collection_jobs
+    job = collection_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.get("/feeds")
+def get_feeds():
+    """The feed registry with each feed's polling schedule and health"""
+    from .feeds import list_feeds
+    return {"feeds": list_feeds()}
+
+@app.post("/feeds/opml")
+async def import_feeds(request: Request):
+    """Register every feed in an OPML file sent as the request body"""
+    from lxml import etree
+    from .feeds import import_opml
+    body = await request.body()
     try:
-        from .collector import fetch_articles, save_articles
-        articles = fetch_articles()
-        save_articles(articles)
-        return {"message": f"Successfully processed {len(articles)} articles"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error refreshing news: {str(e)}")
+        return await run_in_threadpool(import_opml, body)
+    except (etree.XMLSyntaxError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid OPML: {e}")
+
+@app.get("/feeds/opml")
+def export_feeds():
+    """The feed registry as an OPML file"""
+    from .feeds import export_opml
+    return Response(export_opml(), media_type="text/x-opml")
@@ -0,0 +1,261 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Set to 0 to turn instrumentation off entirely
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+# Upper bounds in seconds, wide enough for both API requests and LLM calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _label_key(names: Tuple[str, ...], labels: Dict[str, str]) -> Tuple[str, ...]:
+    if set(labels) != set(names):
+        raise ValueError(f"expected labels {names}, got {tuple(labels)}")
+    return tuple(str(labels[name]) for name in names)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Monotonic count per label combination"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        # Counter samples end in _total, and HELP/TYPE must name the same
+        # family or Prometheus ingests them untyped
+        self.family = f"{name}_total"
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = _label_key(self.labels, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_label_key(self.labels, labels), 0)
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield f"{self.family}{_format_labels(self.labels, key)} {_format_value(value)}"
+
+class Histogram:
+    """Cumulative-bucket latency histogram per label combination"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.family = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # key -> [per-bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = _label_key(self.labels, labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            counts = self._values.get(_label_key(self.labels, labels))
+            return sum(counts[:-1]) if counts else 0
+
+    def samples(self):
+        with self._lock:
+            values = {key: list(counts) for key, counts in self._values.items()}
+        for key, counts in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                yield f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(counts[-1])}"
+            yield f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}"
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _add(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.family} {metric.help}")
+            lines.append(f"# TYPE {metric.family} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram(
+    "techhub_stage_duration_seconds", "Time spent in each collection and summarization stage", ("stage",))
+STAGE_ERRORS = registry.counter(
+    "techhub_stage_errors", "Failures in each collection and summarization stage", ("stage",))
+FEEDS = registry.counter("techhub_feeds", "Feed polls by outcome (new, not_modified, error)", ("result",))
+ARTICLES = registry.counter(
+    "techhub_articles", "Articles through the collector by outcome (found, saved, duplicate, feed_content)", ("result",))
+SUMMARIES = registry.counter("techhub_summaries", "Summary attempts by outcome (stored, retry, gave_up, cache_hit)", ("result",))
+COLLECTIONS = registry.counter("techhub_collections", "Collection runs by outcome (done, failed)", ("result",))
+REQUEST_SECONDS = registry.histogram(
+    "techhub_http_request_duration_seconds", "API request latency by route", ("method", "route", "status"))
+
+class StageTimings:
+    """Per-run totals of stage durations, for a run summary"""
+
+    def __init__(self):
+        self._stages = {}  # stage -> [count, total seconds, max seconds]
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            entry = self._stages.setdefault(stage, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                stage: {"count": count, "total_s": round(total, 3), "max_s": round(longest, 3)}
+                for stage, (count, total, longest) in self._stages.items()
+            }
+
+def record_stage(stage: str, seconds: float, timings: Optional[StageTimings] = None):
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    if timings is not None:
+        timings.add(stage, seconds)
+
+@contextmanager
+def timed(stage: str, timings: Optional[StageTimings] = None):
+    """Time a block as ``stage``; failures are counted and re-raised"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        record_stage(stage, time.perf_counter() - start, timings)
+
+class MetricsMiddleware:
+    """Record the latency of every HTTP request under its route template"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        streaming = False
+
+        async def send_wrapper(message):
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                streaming = any(name == b"content-type" and value.startswith(b"text/event-stream")
+                                for name, value in message.get("headers", ()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Routes are labelled by template (/articles/{article_id}), never by
+            # raw path, so the number of series stays bounded
+            route = scope.get("route")
+            # Event streams stay open for as long as the client is connected
+            if not streaming:
+                REQUEST_SECONDS.observe(
+                    time.perf_counter() - start,
+                    method=scope["method"],
+                    route=getattr(route, "path_format", None) or "unmatched",
+                    status=str(status)
+                )
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def serve(port: int) -> ThreadingHTTPServer:
+    """Expose /metrics on ``port`` from a background thread (for processes without the API)"""
+    server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
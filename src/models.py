@@ -1,6 +1,12 @@
-from sqlalchemy import create_engine, Column, String, DateTime, Integer, Text
-from sqlalchemy.orm import declarative_base, sessionmaker
+import os
+import zlib
+from sqlalchemy import create_engine, event, inspect, text, BigInteger, Column, String, DateTime, Float, Integer, LargeBinary, Text, ForeignKey, Index
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import declarative_base, deferred, sessionmaker
+from sqlalchemy.pool import StaticPool
 from datetime import datetime, timezone
+from typing import Optional
 
 Base = declarative_base()
 
@@ -9,10 +15,48 @@ class Article(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String)
     link = Column(String, unique=True)
-    content = Column(Text)
+    # Full text lives compressed in article_bodies on SQLite (see content_store.py);
+    # on PostgreSQL it stays here, where TOAST already compresses it out of line
+    content = deferred(Column(Text))
+    # Start of the text for list views, so they never read the full body
+    preview = Column(String, nullable=True)
     summary = Column(Text, nullable=True)
     image_url = Column(String, nullable=True)
     published = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    # Set on near-duplicates (the same story under another URL) to the first copy stored
+    canonical_id = Column(Integer, ForeignKey("articles.id", ondelete="SET NULL"), nullable=True, index=True)
+    # Set once the article has moved to the archive (see retention.py); the
+    # row keeps only id, title, link and dates, for dedup and lookups by id
+    archived_at = Column(DateTime(timezone=True), nullable=True)
+    __table_args__ = (
+        # Keyset pagination over the newest-first article list
+        Index("ix_articles_published_id", "published", "id"),
+        # Only the rows still in the hot window, so each archive batch starts
+        # at the oldest live article instead of walking past archived ones
+        Index("ix_articles_live_published_id", "published", "id",
+              sqlite_where=archived_at.is_(None), postgresql_where=archived_at.is_(None)),
+    )
+
+class ArticleBody(Base):
+    """zlib-compressed full article text, read only when the whole body is needed"""
+    __tablename__ = "article_bodies"
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+    length = Column(Integer, nullable=False)  # Characters of uncompressed text
+
+CONTENT_COMPRESSION_LEVEL = int(os.getenv("CONTENT_COMPRESSION_LEVEL", "6"))
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Timestamps are stored in UTC; SQLite returns them without an offset"""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+def compress_text(value: str) -> bytes:
+    return zlib.compress((value or "").encode("utf-8"), CONTENT_COMPRESSION_LEVEL)
+
+def decompress_text(data: bytes) -> str:
+    return zlib.decompress(data).decode("utf-8") if data is not None else None
 
 class Metadata(Base):
     __tablename__ = "metadata"
@@ -21,10 +65,217 @@ class Metadata(Base):
     value = Column(String)
     updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
-DATABASE_URL = "sqlite:///./news.db"
+class FeedState(Base):
+    """The feed registry: every polled feed, its HTTP cache validators and its polling schedule"""
+    __tablename__ = "feed_state"
+    id = Column(Integer, primary_key=True, index=True)
+    feed_url = Column(String, unique=True)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    content_hash = Column(String, nullable=True)
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    title = Column(String, nullable=True)
+    enabled = Column(Integer, nullable=True, default=1)  # NULL (older rows) counts as enabled
+    # Adaptive schedule, see feeds.py
+    poll_interval = Column(Float, nullable=True)  # Seconds between successful polls
+    update_rate = Column(Float, nullable=True)  # Smoothed new entries per hour
+    next_poll_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    last_polled_at = Column(DateTime(timezone=True), nullable=True)
+    failures = Column(Integer, nullable=True, default=0)  # Consecutive failed polls
+    last_error = Column(String, nullable=True)
+
+class PendingSummary(Base):
+    """Articles waiting for the background summary workers"""
+    __tablename__ = "pending_summaries"
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    # NULL means due now; set to a later time to back off after a failure
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    # Lease held by the worker currently summarizing the article
+    claimed_until = Column(DateTime(timezone=True), nullable=True)
+
+class SummaryCache(Base):
+    """LLM output keyed by a hash of the normalized article text and model"""
+    __tablename__ = "summary_cache"
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String, unique=True)
+    model = Column(String)
+    summary = Column(Text)
+    key_points = Column(Text)  # JSON-encoded list
+    sentiment = Column(String)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+class ArticleTerm(Base):
+    """Inverted index of keyword postings, written at ingest for trending"""
+    __tablename__ = "article_terms"
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    term = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False)  # Occurrences in title + content
+    in_title = Column(Integer, nullable=False, default=0)  # 1 if the term is in the title
+    published = Column(DateTime(timezone=True), nullable=False)  # Copied from the article for window scans
+    __table_args__ = (
+        # Covers the per-keyword window scans in trending
+        Index("ix_article_terms_term_window", "term", "published", "article_id", "in_title", "count"),
+    )
+
+class TermBucket(Base):
+    """Keyword mentions per hour, so window totals don't scan every posting"""
+    __tablename__ = "term_buckets"
+    bucket = Column(DateTime(timezone=True), primary_key=True)  # Start of the hour
+    term = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False)
+    __table_args__ = (
+        # Covers the window totals query in trending
+        Index("ix_term_buckets_bucket_term_count", "bucket", "term", "count"),
+    )
+
+class ArticleCount(Base):
+    """Running article totals, incremented in the same transaction as each insert"""
+    __tablename__ = "article_counts"
+    scope = Column(String, primary_key=True)  # "total", "day" (UTC date) or "feed" (feed URL)
+    key = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class ArticleFingerprint(Base):
+    """SimHash of a canonical article's text, split into bands for near-duplicate lookup"""
+    __tablename__ = "article_fingerprints"
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    simhash = Column(BigInteger, nullable=False)  # 64-bit fingerprint stored as a signed integer
+    band0 = Column(Integer, nullable=False, index=True)
+    band1 = Column(Integer, nullable=False, index=True)
+    band2 = Column(Integer, nullable=False, index=True)
+    band3 = Column(Integer, nullable=False, index=True)
+    published = Column(DateTime(timezone=True), nullable=False, index=True)
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+ArchiveBase = declarative_base()
+
+class ArchivedArticle(ArchiveBase):
+    """Full record of an article past the retention window, in the archive database"""
+    __tablename__ = "archived_articles"
+    id = Column(Integer, primary_key=True)  # Same id as in articles
+    title = Column(String)
+    link = Column(String)
+    summary = Column(Text, nullable=True)
+    image_url = Column(String, nullable=True)
+    published = Column(DateTime(timezone=True))
+    canonical_id = Column(Integer, nullable=True)
+    data = Column(LargeBinary, nullable=True)  # zlib-compressed text, as in article_bodies
+    length = Column(Integer, nullable=False, default=0)
+    archived_at = Column(DateTime(timezone=True), nullable=False)
+
+# Any SQLAlchemy URL; SQLite and PostgreSQL (postgresql+psycopg2://...) are supported
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./news.db")
+if DATABASE_URL.startswith("postgres://"):
+    # Heroku-style URLs use a scheme SQLAlchemy doesn't accept
+    DATABASE_URL = "postgresql://" + DATABASE_URL[len("postgres://"):]
+
+# Connection pool sizing
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Recycle server connections before proxies or the server drop idle ones
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# SQLite tuning, applied to every new connection. WAL lets API readers keep
+# reading while the collector writes; busy_timeout makes writers queue
+# instead of failing with "database is locked".
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "10000"))  # milliseconds
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # negative values are KiB
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # bytes
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        # Only takes effect on a new, empty file; retention.py converts
+        # existing databases once so freed pages can be returned in steps
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        cursor.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT}")
+        cursor.execute(f"PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA cache_size = {SQLITE_CACHE_SIZE}")
+        cursor.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+        cursor.execute("PRAGMA temp_store = MEMORY")
+    finally:
+        cursor.close()
+    _register_sqlite_functions(dbapi_connection, connection_record)
+
+def _register_sqlite_functions(dbapi_connection, connection_record):
+    # Lets SQL (the full-text index in particular) read compressed bodies
+    dbapi_connection.create_function("inflate", 1, decompress_text, deterministic=True)
+
+def create_db_engine(url: str = DATABASE_URL):
+    """Create an engine for ``url`` with pooling and per-connection tuning"""
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            # One shared connection for every thread (each connection would
+            # otherwise get its own empty database); pool options and WAL don't apply
+            engine = create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+            event.listen(engine, "connect", _register_sqlite_functions)
+            return engine
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT / 1000},
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+        return engine
+    # Client/server databases such as PostgreSQL, shared by several API replicas
+    connect_args = {}
+    if url.get_backend_name() == "postgresql" and url.get_driver_name() == "psycopg2":
+        connect_args["application_name"] = os.getenv("DB_APPLICATION_NAME", "techhub")
+    return create_engine(
+        url,
+        connect_args=connect_args,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def dialect_insert(table):
+    """INSERT construct with ON CONFLICT support for the configured backend"""
+    if engine.dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+# Large scans fetch rows in chunks (server-side cursors on PostgreSQL)
+STREAM_CHUNK_SIZE = 10000
+
+def _add_missing_columns():
+    """Add nullable columns introduced after a table was first created"""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+
 def init_db():
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+    # create_all skips indexes on tables that already exist
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    
+    # The old full-text index read articles.content, which the migration empties
+    from .content_store import migrate_content
+    from .search import drop_outdated_search_index, init_search
+    from .stats import build_counts
+    drop_outdated_search_index()
+    migrate_content()
+    init_search()
+    # Before any ingest, so no increment is counted twice or lost
+    build_counts()
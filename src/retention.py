@@ -0,0 +1,256 @@
+import argparse
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, func, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+
+from .content_store import COMPRESSED, load_content
+from .dedup import DEDUP_WINDOW_DAYS
+from .http_cache import data_changed
+from .models import (DATABASE_URL, engine, create_db_engine, SessionLocal, Article, ArticleBody,
+                     ArticleTerm, ArchiveBase, ArchivedArticle, Metadata, PendingSummary, TermBucket,
+                     as_utc, compress_text, decompress_text)
+from .search import unindex_articles
+
+# Articles published within this many days stay in the hot tables (0 = keep
+# everything). Never shorter than the near-duplicate window.
+RETENTION_DAYS = float(os.getenv("RETENTION_DAYS", "180"))
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "500"))
+# Free pages returned to the filesystem per step of incremental vacuum
+RETENTION_VACUUM_PAGES = int(os.getenv("RETENTION_VACUUM_PAGES", "2000"))
+
+def _default_archive_url() -> Optional[str]:
+    url = make_url(DATABASE_URL)
+    if url.get_backend_name() != "sqlite":
+        # Client/server databases keep the archive as a table beside articles
+        return DATABASE_URL
+    if url.database in (None, "", ":memory:"):
+        return None
+    root, ext = os.path.splitext(url.database)
+    return str(url.set(database=f"{root}_archive{ext or '.db'}"))
+
+# A separate SQLite file by default, so the hot database stays small
+ARCHIVE_DATABASE_URL = os.getenv("ARCHIVE_DATABASE_URL") or _default_archive_url()
+
+archive_engine = None
+ArchiveSession = None
+if ARCHIVE_DATABASE_URL:
+    archive_engine = engine if ARCHIVE_DATABASE_URL == DATABASE_URL else create_db_engine(ARCHIVE_DATABASE_URL)
+    ArchiveSession = sessionmaker(autocommit=False, autoflush=False, bind=archive_engine)
+
+_archive_ready = False
+_archive_lock = threading.Lock()
+
+def init_archive():
+    global _archive_ready
+    with _archive_lock:
+        if not _archive_ready:
+            ArchiveBase.metadata.create_all(bind=archive_engine)
+            _archive_ready = True
+
+def load_archived(article_ids: List[int]) -> Dict[int, Dict]:
+    """Full records of archived articles, with their text decompressed"""
+    if not article_ids or archive_engine is None:
+        return {}
+    init_archive()
+    db = ArchiveSession()
+    try:
+        rows = db.query(ArchivedArticle).filter(ArchivedArticle.id.in_(article_ids)).all()
+        return {
+            row.id: {
+                "id": row.id,
+                "title": row.title,
+                "link": row.link,
+                "summary": row.summary,
+                "image_url": row.image_url,
+                "published": row.published,
+                "canonical_id": row.canonical_id,
+                "content": decompress_text(row.data) if row.data is not None else None,
+                "archived_at": row.archived_at
+            } for row in rows
+        }
+    finally:
+        db.close()
+
+def load_article_text(db, article: Article):
+    """Full text and summary of an article, read from the archive once it has moved there"""
+    if article.archived_at is None:
+        return load_content(db, article.id), article.summary
+    archived = load_archived([article.id]).get(article.id, {})
+    return archived.get("content"), archived.get("summary")
+
+def _archive_insert():
+    if archive_engine.dialect.name == "postgresql":
+        return postgresql.insert(ArchivedArticle.__table__)
+    return sqlite.insert(ArchivedArticle.__table__)
+
+def archive_batch(db, cutoff: datetime, batch_size: int = RETENTION_BATCH_SIZE) -> int:
+    """Archive up to ``batch_size`` of the oldest articles published before ``cutoff``.
+
+    The archive copy is committed first, so an interrupted run only leaves
+    rows that are copied again (and skipped) next time.
+    """
+    table = Article.__table__
+    columns = [table.c.id, table.c.title, table.c.link, table.c.summary, table.c.image_url,
+               table.c.published, table.c.canonical_id]
+    if COMPRESSED:
+        query = select(*columns, ArticleBody.data, ArticleBody.length).outerjoin(
+            ArticleBody, ArticleBody.article_id == table.c.id)
+    else:
+        query = select(*columns, table.c.content)
+    rows = db.execute(
+        query.where(table.c.archived_at.is_(None), table.c.published < cutoff)
+        .order_by(table.c.published, table.c.id).limit(batch_size)
+    ).all()
+    if not rows:
+        return 0
+
+    now = datetime.now(timezone.utc)
+    records = []
+    for row in rows:
+        record = {column.name: getattr(row, column.name) for column in columns}
+        if COMPRESSED:
+            # Bodies are already compressed; copy the bytes as they are
+            record.update(data=row.data, length=row.length or 0)
+        else:
+            record.update(data=compress_text(row.content), length=len(row.content or ""))
+        record["archived_at"] = now
+        records.append(record)
+
+    archive = ArchiveSession()
+    try:
+        archive.execute(_archive_insert().on_conflict_do_nothing(index_elements=["id"]), records)
+        archive.commit()
+    finally:
+        archive.close()
+
+    ids = [row.id for row in rows]
+    try:
+        # Out of search, trending and the summary queue; title, link and the
+        # fingerprint stay so feeds and near-duplicates still match
+        if COMPRESSED:
+            unindex_articles(db, ids)
+            db.execute(delete(ArticleBody).where(ArticleBody.article_id.in_(ids)))
+        db.execute(delete(ArticleTerm).where(ArticleTerm.article_id.in_(ids)))
+        db.execute(delete(PendingSummary).where(PendingSummary.article_id.in_(ids)))
+        db.execute(
+            update(Article).where(Article.id.in_(ids))
+            .values(content=None, preview=None, summary=None, image_url=None, archived_at=now)
+        )
+        db.execute(update(Metadata).where(Metadata.key == "last_fetch").values(updated_at=now))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(ids)
+
+def prune_term_buckets(db, cutoff: datetime) -> int:
+    """Drop hourly trending totals older than the hot window, a day per transaction"""
+    oldest = db.query(func.min(TermBucket.bucket)).scalar()
+    deleted = 0
+    while oldest is not None:
+        oldest = as_utc(oldest)
+        if oldest >= cutoff:
+            break
+        until = min(oldest + timedelta(days=1), cutoff)
+        deleted += db.execute(delete(TermBucket).where(TermBucket.bucket < until)).rowcount
+        db.commit()
+        oldest = db.query(func.min(TermBucket.bucket)).scalar()
+    return deleted
+
+def ensure_incremental_vacuum() -> bool:
+    """Switch a SQLite database to incremental auto-vacuum, returning whether it is on.
+
+    Databases created before this need one full VACUUM to switch, which
+    locks the file while it runs; after that space is reclaimed in steps.
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        mode = conn.execute(text("PRAGMA auto_vacuum")).scalar()
+        if mode == 2:
+            return True
+        print("🧹 Switching the database to incremental vacuum (one-time full VACUUM)...")
+        conn.execute(text("PRAGMA auto_vacuum = INCREMENTAL"))
+        conn.execute(text("VACUUM"))
+        return conn.execute(text("PRAGMA auto_vacuum")).scalar() == 2
+
+def reclaim_space(pages: int = RETENTION_VACUUM_PAGES) -> int:
+    """Return free pages to the filesystem, ``pages`` per short write transaction"""
+    if engine.dialect.name != "sqlite":
+        # PostgreSQL's autovacuum makes the space reusable on its own
+        return 0
+    freed = 0
+    raw = engine.raw_connection()
+    try:
+        # sqlite3's execute() runs only the first step of incremental_vacuum,
+        # which frees a single page; executescript() runs it to completion
+        connection = raw.driver_connection
+        while True:
+            free = connection.execute("PRAGMA freelist_count").fetchone()[0]
+            if not free:
+                break
+            connection.executescript(f"PRAGMA incremental_vacuum({min(free, pages)})")
+            after = connection.execute("PRAGMA freelist_count").fetchone()[0]
+            if after >= free:
+                break
+            freed += free - after
+    finally:
+        raw.close()
+    return freed
+
+def run_retention(days: float = RETENTION_DAYS, batch_size: int = RETENTION_BATCH_SIZE, dry_run: bool = False) -> Dict:
+    """Archive everything older than the hot window, returning what was done"""
+    if days <= 0 or archive_engine is None:
+        return {"archived": 0, "disabled": True}
+    days = max(days, DEDUP_WINDOW_DAYS)
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+
+    db = SessionLocal()
+    try:
+        if dry_run:
+            due = db.query(func.count(Article.id)).filter(
+                Article.archived_at.is_(None), Article.published < cutoff
+            ).scalar()
+            return {"due": due, "cutoff": cutoff.isoformat(), "dry_run": True}
+
+        init_archive()
+        incremental = ensure_incremental_vacuum()
+        prune_term_buckets(db, cutoff)
+        archived = pages = 0
+        while True:
+            moved = archive_batch(db, cutoff, batch_size)
+            archived += moved
+            if incremental:
+                pages += reclaim_space()
+            if moved < batch_size:
+                break
+    finally:
+        db.close()
+
+    if archived:
+        data_changed()
+        print(f"📦 Archived {archived} articles published before {cutoff.date()}")
+    if pages:
+        print(f"🧹 Returned {pages} free pages to the filesystem")
+    return {"archived": archived, "pages_freed": pages, "cutoff": cutoff.isoformat()}
+
+def main():
+    from .models import init_db
+
+    parser = argparse.ArgumentParser(description='Archive articles older than the hot window')
+    parser.add_argument('--days', type=float, default=RETENTION_DAYS, help='Hot window in days')
+    parser.add_argument('--batch-size', type=int, default=RETENTION_BATCH_SIZE, help='Articles per batch')
+    parser.add_argument('--dry-run', action='store_true', help='Only count the articles that would move')
+    args = parser.parse_args()
+
+    init_db()
+    print(run_retention(args.days, args.batch_size, args.dry_run))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import html
+import json
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from .models import engine, SessionLocal, Article
+
+# Markers placed around matches by the database, swapped for <mark> tags
+# after the snippet text has been HTML-escaped
+_HIT_START = "\x02"
+_HIT_END = "\x03"
+
+SNIPPET_TOKENS = 24
+
+# SQLite: external-content FTS5 index over a view that joins each article to
+# its compressed body (inflate() is registered on every connection). Triggers
+# keep it in sync: an article is indexed when its body is stored, and
+# re-indexed on title or summary changes.
+SQLITE_FTS_DDL = [
+    """CREATE VIEW IF NOT EXISTS article_documents AS
+        SELECT a.id AS id, a.title AS title, a.summary AS summary, inflate(b.data) AS content
+        FROM articles a JOIN article_bodies b ON b.article_id = a.id""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+        title, summary, content,
+        content='article_documents', content_rowid='id',
+        tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON article_bodies BEGIN
+        INSERT INTO articles_fts(rowid, title, summary, content)
+        SELECT a.id, a.title, a.summary, inflate(new.data) FROM articles a WHERE a.id = new.article_id;
+    END""",
+    # Bodies are removed together with their article (SQLite doesn't cascade
+    # unless foreign keys are enforced)
+    """CREATE TRIGGER IF NOT EXISTS articles_fts_delete BEFORE DELETE ON articles BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, title, summary, content)
+        SELECT 'delete', old.id, old.title, old.summary, inflate(b.data) FROM article_bodies b WHERE b.article_id = old.id;
+        DELETE FROM article_bodies WHERE article_id = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF title, summary ON articles BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, title, summary, content)
+        SELECT 'delete', old.id, old.title, old.summary, inflate(b.data) FROM article_bodies b WHERE b.article_id = old.id;
+        INSERT INTO articles_fts(rowid, title, summary, content)
+        SELECT new.id, new.title, new.summary, inflate(b.data) FROM article_bodies b WHERE b.article_id = new.id;
+    END""",
+]
+
+# Objects of the first index, which read article text straight from articles
+LEGACY_SQLITE_FTS = ["articles_fts_insert", "articles_fts_delete", "articles_fts_update"]
+
+# PostgreSQL: GIN index on the same tsvector expression the search query uses
+POSTGRES_DOCUMENT = (
+    "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(summary, '') || ' ' || coalesce(content, ''))"
+)
+POSTGRES_FTS_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_articles_fts ON articles USING gin ({POSTGRES_DOCUMENT})",
+]
+
+def drop_outdated_search_index():
+    """Drop a full-text index built over articles.content, before that column is emptied"""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        definition = conn.execute(text(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'"
+        )).scalar()
+        if definition and "article_documents" not in definition:
+            for trigger in LEGACY_SQLITE_FTS:
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+            conn.execute(text("DROP TABLE articles_fts"))
+
+def init_search():
+    """Create the full-text index for the configured backend, indexing existing rows once"""
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'"
+            )).first()
+            for statement in SQLITE_FTS_DDL:
+                conn.execute(text(statement))
+            if not exists:
+                conn.execute(text("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')"))
+        elif engine.dialect.name == "postgresql":
+            for statement in POSTGRES_FTS_DDL:
+                conn.execute(text(statement))
+
+def unindex_articles(db, article_ids: List[int]):
+    """Remove articles from the SQLite full-text index before their bodies are deleted"""
+    if engine.dialect.name != "sqlite" or not article_ids:
+        return
+    db.execute(text("""
+        INSERT INTO articles_fts(articles_fts, rowid, title, summary, content)
+        SELECT 'delete', a.id, a.title, a.summary, inflate(b.data)
+        FROM articles a JOIN article_bodies b ON b.article_id = a.id
+        WHERE a.id IN (SELECT value FROM json_each(:ids))
+    """), {"ids": json.dumps(list(article_ids))})
+
+def fts5_query(q: str) -> str:
+    """Turn free text into a safe FTS5 query: every word must match, ``word*`` is a prefix search"""
+    terms = []
+    for word in re.findall(r"[\w']+\*?", q):
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', "")
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+def _highlight(snippet: Optional[str]) -> str:
+    escaped = html.escape(snippet or "")
+    return escaped.replace(_HIT_START, "<mark>").replace(_HIT_END, "</mark>")
+
+def _parse_cursor(before: str) -> Tuple[float, int]:
+    try:
+        score, article_id = before.rsplit(",", 1)
+        return float(score), int(article_id)
+    except ValueError:
+        raise ValueError("Invalid cursor, expected before=<score>,<id>")
+
+def search_articles(q: str, limit: int = 20, before: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+    """Rank articles matching ``q`` (best first) and return ``(results, next_cursor)``.
+
+    ``before`` is the ``<score>,<id>`` cursor returned with the previous page.
+    Raises ValueError for an unusable query or cursor.
+    """
+    cursor = _parse_cursor(before) if before else None
+    if engine.dialect.name == "sqlite":
+        rows = _search_sqlite(q, limit, cursor)
+    elif engine.dialect.name == "postgresql":
+        rows = _search_postgres(q, limit, cursor)
+    else:
+        raise ValueError(f"Full-text search is not supported on {engine.dialect.name}")
+
+    results = [{
+        "id": row.id,
+        "title": row.title,
+        "link": row.link,
+        "summary": row.summary or "No summary available",
+        "image_url": row.image_url,
+        "published": row.published.isoformat() if row.published else None,
+        "snippet": _highlight(row.snippet),
+        "score": score
+    } for row, score in rows]
+    next_cursor = None
+    if results and len(results) == limit:
+        next_cursor = f"{results[-1]['score']!r},{results[-1]['id']}"
+    return results, next_cursor
+
+def _search_sqlite(q: str, limit: int, cursor: Optional[Tuple[float, int]]):
+    match = fts5_query(q)
+    if not match:
+        raise ValueError("Search query has no searchable words")
+
+    page_filter = ""
+    params = {"match": match, "limit": limit}
+    if cursor:
+        page_filter = "WHERE score < :score OR (score = :score AND id < :id)"
+        params.update(score=cursor[0], id=cursor[1])
+
+    db = SessionLocal()
+    try:
+        # Rank first (bm25 is lower-is-better, so negate it), then build
+        # snippets only for the rows on this page
+        page = db.execute(text(f"""
+            SELECT id, score FROM (
+                SELECT rowid AS id, -bm25(articles_fts, 10.0, 3.0, 1.0) AS score
+                FROM articles_fts WHERE articles_fts MATCH :match
+            )
+            {page_filter}
+            ORDER BY score DESC, id DESC
+            LIMIT :limit
+        """), params).all()
+        if not page:
+            return []
+
+        ids = ",".join(str(row.id) for row in page)
+        details = db.execute(text(f"""
+            SELECT a.id, a.title, a.link, a.summary, a.image_url, a.published,
+                   snippet(articles_fts, -1, :start, :end, '…', {SNIPPET_TOKENS}) AS snippet
+            FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid
+            WHERE articles_fts MATCH :match AND articles_fts.rowid IN ({ids})
+        """).columns(published=Article.__table__.c.published.type), {"match": match, "start": _HIT_START, "end": _HIT_END}).all()
+    finally:
+        db.close()
+    return _merge(page, details)
+
+def _search_postgres(q: str, limit: int, cursor: Optional[Tuple[float, int]]):
+    page_filter = ""
+    params = {"q": q, "limit": limit}
+    if cursor:
+        page_filter = "WHERE score < :score OR (score = :score AND id < :id)"
+        params.update(score=cursor[0], id=cursor[1])
+
+    db = SessionLocal()
+    try:
+        # The match is spelled exactly like the ix_articles_fts expression so
+        # the planner can use the index (a document computed in FROM can't)
+        page = db.execute(text(f"""
+            SELECT id, score FROM (
+                SELECT a.id, ts_rank_cd({POSTGRES_DOCUMENT}, query) AS score
+                FROM articles a, websearch_to_tsquery('english', :q) query
+                WHERE {POSTGRES_DOCUMENT} @@ query AND a.archived_at IS NULL
+            ) ranked
+            {page_filter}
+            ORDER BY score DESC, id DESC
+            LIMIT :limit
+        """), params).all()
+        if not page:
+            return []
+
+        # ts_headline re-parses the text, so only run it for this page
+        details = db.execute(text(f"""
+            SELECT a.id, a.title, a.link, a.summary, a.image_url, a.published,
+                   ts_headline('english', coalesce(a.content, ''), websearch_to_tsquery('english', :q),
+                               'StartSel=' || :start || ', StopSel=' || :end || ', MaxWords={SNIPPET_TOKENS}, MinWords=8') AS snippet
+            FROM articles a WHERE a.id = ANY(:ids)
+        """), {"q": q, "ids": [row.id for row in page], "start": _HIT_START, "end": _HIT_END}).all()
+    finally:
+        db.close()
+    return _merge(page, details)
+
+def _merge(page, details):
+    """Pair ranked ``(id, score)`` rows with their detail rows, keeping rank order"""
+    by_id = {row.id: row for row in details}
+    return [(by_id[ranked.id], float(ranked.score)) for ranked in page if ranked.id in by_id]
@@ -1,8 +1,24 @@
+import os
 import re
 from collections import Counter
+from itertools import chain
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict
-from .models import SessionLocal, Article
+from typing import Iterable, List, Dict, Optional, Tuple
+import numpy as np
+from sqlalchemy import func, select
+from .cache import TTLCache
+from .content_store import load_contents
+from .http_cache import data_version
+from .models import SessionLocal, Article, ArticleTerm, TermBucket, Metadata, STREAM_CHUNK_SIZE, dialect_insert
+from .trending_scorer import TermMatrix, rank_articles, WEIGHTINGS
+
+# Keyword weighting used for scoring, see trending_scorer.WEIGHTINGS
+TRENDING_WEIGHTING = os.getenv("TRENDING_WEIGHTING", "presence")
+# Seconds a cached trending result is served before it is recomputed. Once
+# the stored data changes (in any process) the previous result is still
+# served, tagged with its own version, while one recompute runs
+TRENDING_CACHE_TTL = float(os.getenv("TRENDING_CACHE_TTL", "300"))
+TRENDING_CACHE_SIZE = int(os.getenv("TRENDING_CACHE_SIZE", "64"))
 
 class SimpleTrendingDetector:
     def __init__(self):
@@ -14,6 +30,21 @@ class SimpleTrendingDetector:
             'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them',
             'my', 'your', 'his', 'her', 'its', 'our', 'their', 'mine', 'yours', 'hers', 'ours', 'theirs'
         }
+        
+        # Words too common to count as trending keywords
+        self.common_words = {
+            'said', 'new', 'one', 'would', 'could', 'also', 'may', 'first', 'last', 'time', 'year', 'day', 'week', 'month',
+            'from', 'after', 'which', 'there', 'about', 'more', 'than', 'when', 'where', 'what', 'how', 'why', 'who',
+            'some', 'many', 'most', 'other', 'each', 'every', 'all', 'any', 'both', 'either', 'neither', 'such',
+            'very', 'much', 'little', 'few', 'several', 'enough', 'too', 'so', 'as', 'if', 'then', 'than',
+            'because', 'since', 'while', 'during', 'before', 'until', 'unless', 'although', 'though', 'however',
+            'therefore', 'moreover', 'furthermore', 'nevertheless', 'meanwhile', 'consequently', 'accordingly'
+        }
+        if TRENDING_WEIGHTING not in WEIGHTINGS:
+            raise ValueError(f"TRENDING_WEIGHTING must be one of {WEIGHTINGS}, got '{TRENDING_WEIGHTING}'")
+        self.weighting = TRENDING_WEIGHTING
+        self._index_ready = False
+        self.cache = TTLCache(TRENDING_CACHE_TTL, TRENDING_CACHE_SIZE, version=data_version.get)
     
     def clean_text(self, text: str) -> str:
         """Clean and normalize text for analysis"""
@@ -41,88 +72,192 @@ class SimpleTrendingDetector:
         word_counts = Counter(words)
         
         # Return top keywords (excluding very common words)
-        common_words = {
-            'said', 'new', 'one', 'would', 'could', 'also', 'may', 'first', 'last', 'time', 'year', 'day', 'week', 'month',
-            'from', 'after', 'which', 'there', 'about', 'more', 'than', 'when', 'where', 'what', 'how', 'why', 'who',
-            'some', 'many', 'most', 'other', 'each', 'every', 'all', 'any', 'both', 'either', 'neither', 'such',
-            'very', 'much', 'little', 'few', 'several', 'enough', 'too', 'so', 'as', 'if', 'then', 'than',
-            'because', 'since', 'while', 'during', 'before', 'until', 'unless', 'although', 'though', 'however',
-            'therefore', 'moreover', 'furthermore', 'nevertheless', 'meanwhile', 'consequently', 'accordingly'
-        }
         filtered_words = {word: count for word, count in word_counts.items() 
-                         if word not in common_words and len(word) > 4}
+                         if self.is_keyword(word)}
         
         return [word for word, count in Counter(filtered_words).most_common(50)]
     
+    def is_keyword(self, word: str) -> bool:
+        """Whether a cleaned word can be a trending keyword"""
+        return word not in self.common_words and len(word) > 4
+    
+    def article_terms(self, title: str, content: str) -> List[tuple]:
+        """Tokenize an article once into ``(term, count, in_title)`` postings"""
+        counts = Counter(self.clean_text((title or "") + " " + content).split())
+        title_words = set(self.clean_text(title).split()) if title else set()
+        return [
+            (term, count, 1 if term in title_words else 0)
+            for term, count in counts.items() if self.is_keyword(term)
+        ]
+    
+    def index_articles(self, db, articles: Iterable[Dict]):
+        """Add term postings and hourly totals for newly stored articles (the caller commits).
+
+        Each article needs ``id``, ``title``, ``content`` and ``published``.
+        """
+        postings = []
+        buckets = Counter()
+        for article in articles:
+            if not article["content"]:
+                continue
+            hour = article["published"].replace(minute=0, second=0, microsecond=0)
+            for term, count, in_title in self.article_terms(article["title"], article["content"]):
+                postings.append({
+                    "article_id": article["id"],
+                    "term": term,
+                    "count": count,
+                    "in_title": in_title,
+                    "published": article["published"]
+                })
+                buckets[hour, term] += count
+        if postings:
+            db.execute(ArticleTerm.__table__.insert(), postings)
+            self._add_to_buckets(db, buckets)
+    
+    def _add_to_buckets(self, db, buckets: Counter):
+        """Upsert per-hour term totals"""
+        if not buckets:
+            return
+        stmt = dialect_insert(TermBucket.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["bucket", "term"],
+            set_={"count": TermBucket.__table__.c.count + stmt.excluded["count"]}
+        )
+        db.execute(stmt, [
+            {"bucket": hour, "term": term, "count": count}
+            for (hour, term), count in buckets.items()
+        ])
+    
+    def ensure_index(self, batch_size: int = 500):
+        """Index articles stored before the term index existed (runs once per database)"""
+        if self._index_ready:
+            return
+        db = SessionLocal()
+        try:
+            flags = {row.key for row in db.query(Metadata.key).filter(
+                Metadata.key.in_(["term_index_built", "term_buckets_built"])
+            )}
+            now = datetime.now(timezone.utc).isoformat()
+            if "term_index_built" not in flags:
+                indexed = db.query(ArticleTerm.article_id).filter(ArticleTerm.article_id == Article.id)
+                last_id = 0
+                while True:
+                    batch = db.query(Article.id, Article.title, Article.published).filter(
+                        Article.id > last_id, ~indexed.exists()
+                    ).order_by(Article.id).limit(batch_size).all()
+                    if not batch:
+                        break
+                    contents = load_contents(db, [row.id for row in batch])
+                    self.index_articles(db, [dict(row._asdict(), content=contents.get(row.id)) for row in batch])
+                    db.commit()
+                    last_id = batch[-1].id
+                db.add(Metadata(key="term_index_built", value=now))
+                db.add(Metadata(key="term_buckets_built", value=now))
+                db.commit()
+            elif "term_buckets_built" not in flags:
+                # Postings exist from before hourly totals were kept; derive them
+                db.query(TermBucket).delete()
+                buckets = Counter()
+                for term, count, published in db.query(
+                        ArticleTerm.term, ArticleTerm.count, ArticleTerm.published).yield_per(STREAM_CHUNK_SIZE):
+                    buckets[published.replace(minute=0, second=0, microsecond=0), term] += count
+                self._add_to_buckets(db, buckets)
+                db.add(Metadata(key="term_buckets_built", value=now))
+                db.commit()
+            self._index_ready = True
+        finally:
+            db.close()
+    
     def get_trending_news(self, hours: int = 24, limit: int = 10) -> List[Dict]:
         """Get top trending news articles based on keyword frequency"""
+        self.ensure_index()
         db = SessionLocal()
         
-        # Get articles from the last N hours
-        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
-        recent_articles = db.query(Article).filter(
-            Article.published >= cutoff_time
-        ).all()
-        
-        db.close()
-        
-        if not recent_articles:
-            return []
-        
-        # Extract keywords to understand what's trending
-        keywords = self.extract_keywords(recent_articles)
-        top_keywords = set(keywords[:30])  # Top 30 keywords
-        
-        # Score each article based on trending keyword mentions
-        article_scores = []
-        for article in recent_articles:
-            if not article.content:
-                continue
-                
-            # Clean the article text
-            clean_text = self.clean_text(article.title + " " + article.content)
-            article_words = set(clean_text.split())
+        try:
+            cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
             
-            # Calculate trending score
-            trending_score = 0
-            for keyword in top_keywords:
-                if keyword in article_words:
-                    # Weight by keyword frequency in the corpus
-                    keyword_freq = keywords.count(keyword)
-                    trending_score += keyword_freq
+            # Top 30 keywords by frequency across the window, summed from the
+            # hourly totals (the oldest hour is counted in full)
+            first_bucket = cutoff_time.replace(minute=0, second=0, microsecond=0)
+            total = func.sum(TermBucket.count)
+            top_keywords = [
+                row.term for row in db.query(TermBucket.term, total.label("total"))
+                .filter(TermBucket.bucket >= first_bucket)
+                .group_by(TermBucket.term)
+                .order_by(total.desc(), TermBucket.term)
+                .limit(30)
+            ]
+            if not top_keywords:
+                return []
             
-            # Additional scoring factors
-            title_boost = 0
-            if article.title:
-                title_words = set(self.clean_text(article.title).split())
-                for keyword in top_keywords:
-                    if keyword in title_words:
-                        title_boost += 2  # Title mentions are more important
+            # Sparse article × keyword matrix, read one keyword at a time
+            # through the covering (term, published, ...) index
+            # (plain Core selects skip the ORM row processing)
+            terms = ArticleTerm.__table__.c
+            columns = []
+            for col, term in enumerate(top_keywords):
+                rows = db.execute(
+                    select(terms.article_id, terms.count, terms.in_title)
+                    .where(terms.term == term, terms.published >= cutoff_time)
+                ).all()
+                postings = np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=3 * len(rows)).reshape(-1, 3)
+                columns.append(np.column_stack([postings, np.full(len(postings), col)]))
+            postings = np.concatenate(columns)
+            n_documents = None
+            if self.weighting == "tfidf":
+                n_documents = db.query(func.count(Article.id)).filter(Article.published >= cutoff_time).scalar()
+            matrix = TermMatrix.from_arrays(
+                article_ids=postings[:, 0], cols=postings[:, 3], counts=postings[:, 1],
+                in_title=postings[:, 2], vocabulary=top_keywords, n_documents=n_documents
+            )
             
-            total_score = trending_score + title_boost
+            # Score each article: the weight of every trending keyword it
+            # mentions, plus two more per keyword in the title
+            scored = rank_articles(matrix, limit, keywords=np.arange(len(top_keywords)),
+                                   weighting=self.weighting)
+            if not scored:
+                return []
             
-            if total_score > 0:
-                article_scores.append({
-                    'id': article.id,
-                    'title': article.title,
-                    'link': article.link,
-                    'content': article.content[:200] + "..." if len(article.content) > 200 else article.content,
-                    'summary': article.summary or "No summary available",
-                    'image_url': article.image_url,
-                    'published': article.published.isoformat() if article.published else None,
-                    'trending_score': total_score,
-                    'keyword_matches': len(article_words.intersection(top_keywords))
-                })
+            # Load only the card fields of the winning articles
+            rows = db.query(
+                Article.id, Article.title, Article.link, Article.summary, Article.image_url, Article.published,
+                Article.preview.label("content")
+            ).filter(Article.id.in_([article_id for article_id, _, _ in scored])).all()
+        finally:
+            db.close()
         
-        # Sort by trending score (highest first)
-        article_scores.sort(key=lambda x: x['trending_score'], reverse=True)
+        articles = {row.id: row for row in rows}
+        article_scores = []
+        for article_id, score, matches in scored:
+            article = articles.get(article_id)
+            if article is None:
+                continue
+            content = article.content or ""
+            article_scores.append({
+                'id': article.id,
+                'title': article.title,
+                'link': article.link,
+                'content': content[:200] + "..." if len(content) > 200 else content,
+                'summary': article.summary or "No summary available",
+                'image_url': article.image_url,
+                'published': article.published.isoformat() if article.published else None,
+                'trending_score': score,
+                'keyword_matches': matches
+            })
         
-        # Return top trending articles
-        return article_scores[:limit]
+        return article_scores
+    
+    def get_trending_news_cached(self, hours: int = 24, limit: int = 10) -> List[Dict]:
+        """get_trending_news through the result cache"""
+        return self.get_trending_news_versioned(hours, limit)[0]
+    
+    def get_trending_news_versioned(self, hours: int = 24, limit: int = 10) -> Tuple[List[Dict], Optional[datetime]]:
+        """Cached get_trending_news with the data version it was computed from (for the ETag)"""
+        return self.cache.get_versioned((hours, limit), lambda: self.get_trending_news(hours, limit))
     
     def get_trending_topics(self, hours: int = 24) -> List[Dict]:
         """Legacy method - now returns trending news instead of topics"""
-        return self.get_trending_news(hours, 10)
+        return self.get_trending_news_cached(hours, 10)
 
 # Global instance
 trending_detector = SimpleTrendingDetector()
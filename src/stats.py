@@ -0,0 +1,123 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable
+
+from sqlalchemy.exc import IntegrityError
+
+from .models import SessionLocal, Article, ArticleCount, Metadata, STREAM_CHUNK_SIZE, as_utc, dialect_insert
+
+# Feed key for articles stored before per-feed counts were kept
+UNKNOWN_FEED = "unknown"
+
+def day_key(published: datetime) -> str:
+    """UTC calendar day an article is counted under"""
+    return as_utc(published).astimezone(timezone.utc).date().isoformat()
+
+def _tally(rows: Iterable[dict]) -> Counter:
+    counts = Counter()
+    for row in rows:
+        counts["total", ""] += 1
+        counts["day", day_key(row["published"])] += 1
+        counts["feed", row.get("feed_url") or UNKNOWN_FEED] += 1
+    return counts
+
+def _add_counts(db, counts: Counter):
+    if not counts:
+        return
+    stmt = dialect_insert(ArticleCount.__table__)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["scope", "key"],
+            set_={"count": ArticleCount.__table__.c.count + stmt.excluded.count}
+        ),
+        [{"scope": scope, "key": key, "count": count} for (scope, key), count in counts.items()]
+    )
+
+def count_articles(db, rows: Iterable[dict]):
+    """Add newly inserted articles to the running totals (the caller commits)"""
+    _add_counts(db, _tally(rows))
+
+def build_counts():
+    """Count the articles already stored, once per database (called from init_db).
+
+    Runs before this process ingests anything. Totals and per-day counts
+    are recounted from the articles table; per-feed counts can't be (rows
+    don't keep their feed), so existing ones are left alone and only the
+    articles no feed accounts for go under UNKNOWN_FEED.
+    """
+    db = SessionLocal()
+    try:
+        if db.query(Metadata.id).filter(Metadata.key == "article_counts_built").first() is not None:
+            return
+        counts = Counter()
+        for row in db.query(Article.published).filter(Article.published.isnot(None)).yield_per(STREAM_CHUNK_SIZE):
+            counts["total", ""] += 1
+            counts["day", day_key(row.published)] += 1
+        known = sum(
+            count for (count,) in db.query(ArticleCount.count).filter(
+                ArticleCount.scope == "feed", ArticleCount.key != UNKNOWN_FEED)
+        )
+        if counts["total", ""] > known:
+            counts["feed", UNKNOWN_FEED] = counts["total", ""] - known
+        db.query(ArticleCount).filter(ArticleCount.scope.in_(["total", "day"])).delete(synchronize_session=False)
+        db.query(ArticleCount).filter(
+            ArticleCount.scope == "feed", ArticleCount.key == UNKNOWN_FEED).delete(synchronize_session=False)
+        _add_counts(db, counts)
+        db.add(Metadata(key="article_counts_built", value=datetime.now(timezone.utc).isoformat()))
+        db.commit()
+    except IntegrityError:
+        # Another process built them first
+        db.rollback()
+    finally:
+        db.close()
+
+def get_article_counts(days: int = 7) -> Dict:
+    """Totals, today's count and per-day / per-feed breakdowns from the maintained counters"""
+    today = datetime.now(timezone.utc).date()
+    day_keys = [(today - timedelta(days=offset)).isoformat() for offset in range(days)]
+    db = SessionLocal()
+    try:
+        rows = db.query(ArticleCount.scope, ArticleCount.key, ArticleCount.count).filter(
+            (ArticleCount.scope == "total")
+            | (ArticleCount.scope == "feed")
+            | ((ArticleCount.scope == "day") & ArticleCount.key.in_(day_keys))
+        ).all()
+    finally:
+        db.close()
+    
+    by_day = dict.fromkeys(day_keys, 0)
+    by_feed = {}
+    total = 0
+    for scope, key, count in rows:
+        if scope == "total":
+            total = count
+        elif scope == "day":
+            by_day[key] = count
+        else:
+            by_feed[key] = count
+    return {
+        "total": total,
+        "today": by_day[day_keys[0]],
+        "by_day": by_day,
+        "by_feed": dict(sorted(by_feed.items(), key=lambda item: -item[1]))
+    }
+
+def get_stats(days: int = 7) -> Dict:
+    """The /stats payload: article counts plus the time of the last fetch"""
+    counts = get_article_counts(max(1, days))
+    
+    # Get the actual last fetch time
+    db = SessionLocal()
+    try:
+        last_fetch_record = db.query(Metadata.value).filter(Metadata.key == "last_fetch").first()
+    finally:
+        db.close()
+    last_updated = last_fetch_record.value if last_fetch_record else datetime.now(timezone.utc).isoformat()
+    
+    return {
+        "total_articles": counts["total"],
+        "articles_today": counts["today"],
+        "last_updated": last_updated,
+        "articles_by_day": counts["by_day"],
+        "articles_by_feed": counts["by_feed"]
+    }
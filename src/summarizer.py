@@ -1,8 +1,52 @@
-import subprocess
 import json
+import os
+import threading
+import time
 from typing import Dict, Optional
 
-def summarize_with_ollama(text: str, model: str = "mistral") -> Dict[str, str]:
+import requests
+
+# Ollama model server; one keep-alive session is shared by every caller
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434").rstrip("/")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "mistral")
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "60"))
+OLLAMA_RETRIES = int(os.getenv("OLLAMA_RETRIES", "3"))
+OLLAMA_BACKOFF = float(os.getenv("OLLAMA_BACKOFF", "1.0"))
+# Number of background summary workers (see summary_queue.py)
+SUMMARY_WORKERS = int(os.getenv("SUMMARY_WORKERS", "2"))
+
+_session = None
+_session_lock = threading.Lock()
+
+def _get_session() -> requests.Session:
+    """Return the shared keep-alive session to the Ollama server"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=max(1, SUMMARY_WORKERS))
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+def _generate(prompt: str, model: str) -> str:
+    """Call Ollama's generate API, retrying transient failures with exponential backoff"""
+    payload = {"model": model, "prompt": prompt, "stream": False, "format": "json"}
+    for attempt in range(OLLAMA_RETRIES + 1):
+        try:
+            response = _get_session().post(f"{OLLAMA_URL}/api/generate", json=payload, timeout=OLLAMA_TIMEOUT)
+            # Client errors (unknown model etc.) won't succeed on retry
+            if response.status_code < 500:
+                response.raise_for_status()
+                return response.json().get("response", "")
+            error = requests.HTTPError(f"{response.status_code} Server Error from Ollama", response=response)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+        if attempt == OLLAMA_RETRIES:
+            raise error
+        time.sleep(OLLAMA_BACKOFF * (2 ** attempt))
+
+def summarize_with_ollama(text: str, model: str = OLLAMA_MODEL) -> Dict[str, str]:
     """
     Summarize text using Ollama with a structured prompt
     Returns a dictionary with summary, key_points, and sentiment
@@ -36,56 +80,20 @@ Please respond in JSON format:
 }}"""
 
     try:
-        cmd = ["ollama", "run", model]
-        proc = subprocess.Popen(
-            cmd, 
-            stdin=subprocess.PIPE, 
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        
-        stdout, stderr = proc.communicate(input=prompt, timeout=60)
-        
-        if proc.returncode != 0:
-            return {
-                "summary": "Error: Failed to process with Ollama",
-                "key_points": [],
-                "sentiment": "neutral",
-                "error": stderr
-            }
-        
-        # Try to parse JSON response
-        try:
-            result = json.loads(stdout.strip())
-            return {
-                "summary": result.get("summary", "No summary generated"),
-                "key_points": result.get("key_points", []),
-                "sentiment": result.get("sentiment", "neutral"),
-                "error": None
-            }
-        except json.JSONDecodeError:
-            # If not JSON, return the raw text as summary
-            return {
-                "summary": stdout.strip(),
-                "key_points": [],
-                "sentiment": "neutral",
-                "error": "Response not in JSON format"
-            }
-            
-    except subprocess.TimeoutExpired:
+        stdout = _generate(prompt, model)
+    except requests.Timeout:
         return {
             "summary": "Error: Ollama request timed out",
             "key_points": [],
             "sentiment": "neutral",
             "error": "Timeout"
         }
-    except FileNotFoundError:
+    except requests.ConnectionError:
         return {
-            "summary": "Error: Ollama not found. Please install Ollama and the model.",
+            "summary": f"Error: Ollama not reachable at {OLLAMA_URL}. Please start Ollama and pull the model.",
             "key_points": [],
             "sentiment": "neutral",
-            "error": "Ollama not installed"
+            "error": "Ollama not available"
         }
     except Exception as e:
         return {
@@ -94,6 +102,24 @@ Please respond in JSON format:
             "sentiment": "neutral",
             "error": str(e)
         }
+    
+    # Try to parse JSON response
+    try:
+        result = json.loads(stdout.strip())
+        return {
+            "summary": result.get("summary", "No summary generated"),
+            "key_points": result.get("key_points", []),
+            "sentiment": result.get("sentiment", "neutral"),
+            "error": None
+        }
+    except (json.JSONDecodeError, AttributeError):
+        # If not JSON, return the raw text as summary
+        return {
+            "summary": stdout.strip(),
+            "key_points": [],
+            "sentiment": "neutral",
+            "error": "Response not in JSON format"
+        }
 
 def get_simple_summary(text: str) -> str:
     """Get a simple text summary without structured output"""
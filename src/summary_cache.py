@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+
+from .cache import LRUCache
+from .metrics import SUMMARIES, timed
+from .models import SessionLocal, SummaryCache, dialect_insert
+from .summarizer import summarize_with_ollama, OLLAMA_MODEL
+
+SUMMARY_CACHE_SIZE = int(os.getenv("SUMMARY_CACHE_SIZE", "1024"))
+
+_memory = LRUCache(SUMMARY_CACHE_SIZE)
+
+def content_key(text: str, model: str) -> str:
+    """Hash of whitespace-normalized text plus model name"""
+    normalized = " ".join((text or "").split())
+    return hashlib.sha256(f"{model}\0{normalized}".encode("utf-8")).hexdigest()
+
+def get_cached_summary(text: str, model: str = OLLAMA_MODEL) -> Optional[Dict]:
+    """Return a stored summary for this text, checking memory before the database"""
+    key = content_key(text, model)
+    cached = _memory.get(key)
+    if cached is not None:
+        return dict(cached)
+
+    db = SessionLocal()
+    try:
+        row = db.query(SummaryCache).filter(SummaryCache.content_hash == key).first()
+    finally:
+        db.close()
+    if row is None:
+        return None
+
+    cached = {
+        "summary": row.summary,
+        "key_points": json.loads(row.key_points or "[]"),
+        "sentiment": row.sentiment,
+        "error": None
+    }
+    _memory.put(key, cached)
+    return dict(cached)
+
+def store_summary(text: str, result: Dict, model: str = OLLAMA_MODEL):
+    """Remember a successful summary for this text"""
+    key = content_key(text, model)
+    cached = {
+        "summary": result["summary"],
+        "key_points": result.get("key_points", []),
+        "sentiment": result.get("sentiment", "neutral"),
+        "error": None
+    }
+    db = SessionLocal()
+    try:
+        db.execute(dialect_insert(SummaryCache.__table__).values(
+            content_hash=key,
+            model=model,
+            summary=cached["summary"],
+            key_points=json.dumps(cached["key_points"]),
+            sentiment=cached["sentiment"]
+        ).on_conflict_do_nothing(index_elements=["content_hash"]))
+        db.commit()
+    except Exception as e:
+        print(f"❌ Failed to cache summary: {e}")
+        db.rollback()
+    finally:
+        db.close()
+    _memory.put(key, cached)
+
+def summarize_cached(text: str, model: str = OLLAMA_MODEL) -> Dict:
+    """summarize_with_ollama, reusing earlier output for identical content"""
+    cached = get_cached_summary(text, model)
+    if cached is not None:
+        SUMMARIES.inc(result="cache_hit")
+        return cached
+    with timed("llm"):
+        result = summarize_with_ollama(text, model)
+    # Failures are not cached so they are retried next time
+    if result["error"] is None:
+        store_summary(text, result, model)
+    return result
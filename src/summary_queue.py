@@ -0,0 +1,220 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from sqlalchemy import delete, or_, select, update
+
+from .content_store import load_content
+from .http_cache import data_changed
+from .metrics import SUMMARIES, timed
+from .models import SessionLocal, Article, Metadata, PendingSummary, dialect_insert
+from .summarizer import SUMMARY_WORKERS
+from .summary_cache import summarize_cached
+
+# Articles shorter than this are not worth an LLM call
+MIN_CONTENT_LENGTH = 100
+MAX_ATTEMPTS = int(os.getenv("SUMMARY_MAX_ATTEMPTS", "5"))
+# Seconds to wait after the first failure, doubled on each further one
+RETRY_BACKOFF = float(os.getenv("SUMMARY_RETRY_BACKOFF", "60"))
+# How long a worker may hold an article before another worker can take it over
+LEASE_SECONDS = float(os.getenv("SUMMARY_LEASE_SECONDS", "300"))
+POLL_INTERVAL = float(os.getenv("SUMMARY_POLL_INTERVAL", "10"))
+
+_wakeup = threading.Event()
+
+def enqueue_links(db, links):
+    """Queue stored, unsummarized articles with these links (the caller commits).
+
+    Callers pass only articles with more than MIN_CONTENT_LENGTH characters.
+    """
+    links = list(links)
+    if not links:
+        return
+    stmt = dialect_insert(PendingSummary.__table__).from_select(
+        ["article_id"],
+        select(Article.id).where(
+            Article.link.in_(links),
+            or_(Article.summary.is_(None), Article.summary == "")
+        )
+    ).on_conflict_do_nothing(index_elements=["article_id"])
+    db.execute(stmt)
+
+def notify_workers():
+    """Wake idle workers in this process after new articles were queued"""
+    _wakeup.set()
+
+def due_article_ids(limit: int = 100) -> List[int]:
+    """Return queued article ids that are ready to be summarized, newest first"""
+    now = datetime.now(timezone.utc)
+    db = SessionLocal()
+    try:
+        rows = db.query(PendingSummary.article_id).filter(
+            or_(PendingSummary.next_attempt_at.is_(None), PendingSummary.next_attempt_at <= now),
+            or_(PendingSummary.claimed_until.is_(None), PendingSummary.claimed_until < now)
+        ).order_by(PendingSummary.article_id.desc()).limit(limit).all()
+        return [row.article_id for row in rows]
+    finally:
+        db.close()
+
+def _claim(article_id: int):
+    """Take the lease on a queued article and return its content, or None if someone else has it"""
+    now = datetime.now(timezone.utc)
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            update(PendingSummary)
+            .where(
+                PendingSummary.article_id == article_id,
+                or_(PendingSummary.claimed_until.is_(None), PendingSummary.claimed_until < now)
+            )
+            .values(claimed_until=now + timedelta(seconds=LEASE_SECONDS))
+        )
+        if result.rowcount != 1:
+            db.rollback()
+            return None
+        content = load_content(db, article_id)
+        if content is None:
+            db.execute(delete(PendingSummary).where(PendingSummary.article_id == article_id))
+            db.commit()
+            return None
+        db.commit()
+        return content
+    finally:
+        db.close()
+
+def summarize_pending(article_id: int) -> bool:
+    """Summarize one queued article, returning True if a summary was stored"""
+    content = _claim(article_id)
+    if content is None:
+        return False
+
+    # No database connection is held while waiting on the model; syndicated
+    # copies of the same text are answered from the cache
+    with timed("summarize"):
+        result = summarize_cached(content)
+
+    db = SessionLocal()
+    try:
+        if result["error"] is None or result["error"] == "Response not in JSON format":
+            db.execute(update(Article).where(Article.id == article_id).values(summary=result["summary"]))
+            # Near-duplicates stored before the summary was ready share it
+            db.execute(update(Article).where(
+                Article.canonical_id == article_id,
+                or_(Article.summary.is_(None), Article.summary == "")
+            ).values(summary=result["summary"]))
+            db.execute(delete(PendingSummary).where(PendingSummary.article_id == article_id))
+            # Move the summary marker so caches of pages showing summaries
+            # revalidate; counts and other article-only views keep theirs
+            now = datetime.now(timezone.utc)
+            stmt = dialect_insert(Metadata.__table__).values(key="last_summary", value=now.isoformat(), updated_at=now)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=["key"],
+                set_={"value": stmt.excluded.value, "updated_at": stmt.excluded.updated_at}
+            ))
+            db.commit()
+            data_changed(summaries_only=True)
+            SUMMARIES.inc(result="stored")
+            return True
+
+        pending = db.get(PendingSummary, article_id)
+        if pending is not None:
+            pending.attempts += 1
+            if pending.attempts >= MAX_ATTEMPTS:
+                print(f"❌ Giving up on summary for article {article_id}: {result['error']}")
+                db.delete(pending)
+                SUMMARIES.inc(result="gave_up")
+            else:
+                delay = RETRY_BACKOFF * (2 ** (pending.attempts - 1))
+                pending.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+                pending.claimed_until = None
+                SUMMARIES.inc(result="retry")
+        db.commit()
+        return False
+    except Exception as e:
+        print(f"❌ Failed to store summary for article {article_id}: {e}")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+def drain_pending_summaries(workers: int = SUMMARY_WORKERS) -> int:
+    """Summarize everything currently due, returning how many summaries were stored"""
+    summarized = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="summary") as executor:
+        while True:
+            ids = due_article_ids()
+            if not ids:
+                break
+            summarized += sum(executor.map(summarize_pending, ids))
+    if summarized:
+        print(f"✅ Summarized {summarized} articles")
+    return summarized
+
+class SummaryWorkerPool:
+    """Background threads that summarize queued articles as they arrive"""
+
+    def __init__(self, workers: int = SUMMARY_WORKERS, poll_interval: float = POLL_INTERVAL):
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self._queue = queue.Queue(maxsize=self.workers)
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._threads = []
+
+    def start(self):
+        if self._threads:
+            return
+        self._stopped.clear()
+        self._threads.append(threading.Thread(target=self._dispatch, name="summary-dispatch", daemon=True))
+        for i in range(self.workers):
+            self._threads.append(threading.Thread(target=self._work, name=f"summary-{i}", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        _wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout=1)
+        self._threads = []
+
+    def _dispatch(self):
+        while not self._stopped.is_set():
+            try:
+                ids = due_article_ids(limit=self.workers * 4)
+            except Exception as e:
+                print(f"❌ Failed to poll summary queue: {e}")
+                ids = []
+            with self._lock:
+                ids = [article_id for article_id in ids if article_id not in self._in_flight]
+                self._in_flight.update(ids)
+
+            for article_id in ids:
+                while not self._stopped.is_set():
+                    try:
+                        self._queue.put(article_id, timeout=1)
+                        break
+                    except queue.Full:
+                        continue
+
+            if not ids:
+                _wakeup.wait(self.poll_interval)
+                _wakeup.clear()
+
+    def _work(self):
+        while not self._stopped.is_set():
+            try:
+                article_id = self._queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            try:
+                summarize_pending(article_id)
+            except Exception as e:
+                print(f"❌ Summary worker failed on article {article_id}: {e}")
+            finally:
+                with self._lock:
+                    self._in_flight.discard(article_id)
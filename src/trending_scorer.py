@@ -0,0 +1,151 @@
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# How keyword mentions are weighted when scoring an article:
+#   presence  - every trending keyword counts once (the original scoring)
+#   frequency - each keyword counts its total mentions across the window
+#   tfidf     - each keyword counts its inverse document frequency in the window
+WEIGHTINGS = ("presence", "frequency", "tfidf")
+
+class TermMatrix:
+    """Sparse document-term matrix in coordinate (COO) form.
+
+    Built from ``(article_id, term, count, in_title)`` postings. Documents
+    and terms are mapped to dense indices once, so every scoring step is a
+    handful of vectorized array operations instead of per-article loops.
+    """
+
+    def __init__(self, doc_ids: np.ndarray, vocabulary: List[str], rows: np.ndarray,
+                 cols: np.ndarray, counts: np.ndarray, in_title: np.ndarray,
+                 n_documents: Optional[int] = None):
+        self.doc_ids = doc_ids
+        self.vocabulary = vocabulary
+        self.rows = rows
+        self.cols = cols
+        self.counts = counts
+        self.in_title = in_title
+        # Corpus size for IDF; postings may cover only the documents that
+        # mention a keyword
+        self.n_documents = max(n_documents or 0, len(doc_ids))
+
+    @classmethod
+    def from_arrays(cls, article_ids: np.ndarray, cols: np.ndarray, counts: np.ndarray,
+                    in_title: np.ndarray, vocabulary: List[str],
+                    n_documents: Optional[int] = None) -> "TermMatrix":
+        """Build from parallel posting columns, ``cols`` indexing into ``vocabulary``"""
+        doc_ids, rows = np.unique(np.asarray(article_ids, dtype=np.int64), return_inverse=True)
+        return cls(
+            doc_ids=doc_ids,
+            vocabulary=list(vocabulary),
+            rows=rows.astype(np.int32),
+            cols=np.asarray(cols, dtype=np.int32),
+            counts=np.asarray(counts, dtype=np.float64),
+            in_title=np.asarray(in_title, dtype=np.float64),
+            n_documents=n_documents,
+        )
+
+    @classmethod
+    def from_postings(cls, postings: Iterable[Sequence], n_documents: Optional[int] = None) -> "TermMatrix":
+        """Build from ``(article_id, term, count, in_title)`` rows"""
+        term_index = {}
+        article_ids, cols, counts, in_title = [], [], [], []
+        for article_id, term, count, title_flag in postings:
+            article_ids.append(article_id)
+            cols.append(term_index.setdefault(term, len(term_index)))
+            counts.append(count)
+            in_title.append(title_flag)
+        return cls.from_arrays(article_ids, cols, counts, in_title, list(term_index), n_documents)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.doc_ids), len(self.vocabulary)
+
+    def term_indices(self, terms: Iterable[str]) -> np.ndarray:
+        """Column indices of ``terms``, skipping any not in the vocabulary"""
+        index = {term: i for i, term in enumerate(self.vocabulary)}
+        return np.asarray([index[term] for term in terms if term in index], dtype=np.int64)
+
+    def term_totals(self) -> np.ndarray:
+        """Mentions of each term across all documents (column sums)"""
+        return np.bincount(self.cols, weights=self.counts, minlength=self.shape[1])
+
+    def document_frequency(self) -> np.ndarray:
+        """Number of documents containing each term (column non-zeros)"""
+        return np.bincount(self.cols, minlength=self.shape[1])
+
+    def top_terms(self, k: int) -> np.ndarray:
+        """Indices of the ``k`` most mentioned terms, ties broken alphabetically"""
+        totals = self.term_totals()
+        if len(totals) > k:
+            # Keep everything tied with the k-th total so the alphabetical
+            # tie-break below sees all candidates
+            threshold = np.partition(totals, len(totals) - k)[len(totals) - k]
+            candidates = np.flatnonzero(totals >= threshold)
+        else:
+            candidates = np.arange(len(totals))
+        terms = np.asarray(self.vocabulary, dtype=object)[candidates]
+        order = np.lexsort((terms, -totals[candidates]))
+        return candidates[order][:k]
+
+    def keyword_weights(self, keywords: np.ndarray, weighting: str = "presence") -> np.ndarray:
+        """Per-term weight vector that is zero outside ``keywords``"""
+        weights = np.zeros(self.shape[1])
+        if weighting == "presence":
+            weights[keywords] = 1.0
+        elif weighting == "frequency":
+            weights[keywords] = self.term_totals()[keywords]
+        elif weighting == "tfidf":
+            df = self.document_frequency()[keywords]
+            weights[keywords] = np.log((1 + self.n_documents) / (1 + df)) + 1.0
+        else:
+            raise ValueError(f"Unknown weighting '{weighting}', expected one of {WEIGHTINGS}")
+        return weights
+
+    def score(self, keywords: np.ndarray, weighting: str = "presence",
+              title_boost: float = 2.0) -> Tuple[np.ndarray, np.ndarray]:
+        """Score every document against ``keywords``.
+
+        Returns ``(scores, matches)``: the weighted keyword mentions plus
+        ``title_boost`` per keyword in the title, and the number of keywords
+        each document mentions.
+        """
+        weights = self.keyword_weights(keywords, weighting)
+        is_keyword = np.zeros(self.shape[1], dtype=bool)
+        is_keyword[keywords] = True
+
+        hit = is_keyword[self.cols]
+        rows = self.rows[hit]
+        # X·w plus title_boost·T·1, evaluated over the non-zero entries only
+        entry_scores = weights[self.cols[hit]] + title_boost * self.in_title[hit]
+        n_docs = self.shape[0]
+        scores = np.bincount(rows, weights=entry_scores, minlength=n_docs)
+        matches = np.bincount(rows, minlength=n_docs)
+        return scores, matches
+
+def rank_articles(matrix: TermMatrix, limit: int, keywords: Optional[np.ndarray] = None,
+                  top_k: int = 30, weighting: str = "presence") -> List[Tuple[int, float, int]]:
+    """Return ``(article_id, score, keyword_matches)`` for the best scoring articles.
+
+    Ties keep ascending article id order; articles with no score are dropped.
+    """
+    if matrix.shape[0] == 0:
+        return []
+    if keywords is None:
+        keywords = matrix.top_terms(top_k)
+    scores, matches = matrix.score(keywords, weighting)
+
+    candidates = np.flatnonzero(scores > 0)
+    if len(candidates) > limit:
+        threshold = np.partition(scores[candidates], len(candidates) - limit)[len(candidates) - limit]
+        candidates = candidates[scores[candidates] >= threshold]
+    order = np.lexsort((matrix.doc_ids[candidates], -scores[candidates]))
+    best = candidates[order][:limit]
+    return [
+        (int(matrix.doc_ids[i]), _as_number(scores[i]), int(matches[i]))
+        for i in best
+    ]
+
+def _as_number(value: float):
+    """Keep whole-number scores as ints so the API output stays unchanged"""
+    return int(value) if float(value).is_integer() else round(float(value), 4)
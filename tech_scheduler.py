@@ -1,16 +1,20 @@
 #!/usr/bin/env python3
 """
 Tech News Scheduler
-Automatically fetches tech news every hour
+Polls each registered feed on its own adaptive schedule
 """
 
+import json
+import os
 import time
 import schedule
 import logging
-from datetime import datetime, timezone
-from src.collector import fetch_articles, save_articles, create_table
+from src import feeds, metrics
+from src.collector import CollectionProgress, run_collection, create_table
+from src.retention import run_retention
+from src.summary_queue import SummaryWorkerPool, drain_pending_summaries
 from src.simple_trending import trending_detector
-from src.models import SessionLocal, Article
+from src.stats import get_article_counts
 
 # Setup logging
 logging.basicConfig(
@@ -23,9 +27,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Port for Prometheus to scrape this process's /metrics (0 = off); the API
+# serves its own /metrics
+METRICS_PORT = int(os.getenv("SCHEDULER_METRICS_PORT", "0"))
+
 def run_tech_news_collection():
     """Run tech news collection and analysis"""
-    logger.info("🔄 Starting hourly tech news collection...")
+    logger.info("🔄 Starting tech news collection...")
     start_time = time.time()
     
     try:
@@ -33,8 +41,9 @@ def run_tech_news_collection():
         create_table()
         
         # Fetch and save tech articles
-        articles = fetch_articles()
-        save_articles(articles)
+        progress = CollectionProgress()
+        saved_count = run_collection(progress=progress)
+        logger.info(f"📊 Run summary: {json.dumps(progress.summary())}")
         
         # Analyze trending tech news
         trending = trending_detector.get_trending_news(hours=24, limit=5)
@@ -48,7 +57,7 @@ def run_tech_news_collection():
         duration = end_time - start_time
         
         logger.info(f"✅ Tech news collection completed in {duration:.2f} seconds")
-        logger.info(f"📰 Processed {len(articles)} articles")
+        logger.info(f"📰 Processed {saved_count} articles")
         
         return True
         
@@ -56,15 +65,25 @@ def run_tech_news_collection():
         logger.error(f"❌ Error in tech news collection: {e}")
         return False
 
+def run_feed_cycle(feed_urls):
+    """Poll the feeds that are due (runs on the feed scheduler's threads)"""
+    progress = CollectionProgress()
+    saved_count = run_collection(progress=progress, feed_urls=feed_urls)
+    logger.info(f"📰 Polled {len(feed_urls)} feeds, {saved_count} new articles: {json.dumps(progress.summary())}")
+
+def run_daily_retention():
+    """Archive articles that left the hot window"""
+    try:
+        result = run_retention()
+        logger.info(f"📦 Retention: {json.dumps(result)}")
+    except Exception as e:
+        logger.error(f"❌ Error in retention: {e}")
+
 def get_tech_stats():
     """Get current tech news statistics"""
     try:
-        db = SessionLocal()
-        total_articles = db.query(Article).count()
-        recent_articles = db.query(Article).filter(
-            Article.published >= datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
-        ).count()
-        db.close()
+        counts = get_article_counts(days=1)
+        total_articles, recent_articles = counts["total"], counts["today"]
         
         logger.info(f"📈 Stats: {total_articles} total articles, {recent_articles} today")
         return total_articles, recent_articles
@@ -78,40 +97,57 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description='Tech News Scheduler')
-    parser.add_argument('--interval', type=int, default=60, help='Collection interval in minutes (default: 60)')
-    parser.add_argument('--once', action='store_true', help='Run once and exit')
+    parser.add_argument('--interval', type=float, default=feeds.FEED_DEFAULT_INTERVAL / 60,
+                        help='Polling interval in minutes for feeds without history (default: 60); '
+                             'each feed then adapts to how often it updates')
+    parser.add_argument('--once', action='store_true', help='Poll every feed once and exit')
     parser.add_argument('--daemon', action='store_true', help='Run as daemon with scheduling')
     
     args = parser.parse_args()
     
     logger.info("🚀 Starting Tech News Scheduler")
-    logger.info(f"⏰ Collection interval: {args.interval} minutes")
+    feeds.FEED_DEFAULT_INTERVAL = args.interval * 60
+    logger.info(f"⏰ Initial feed interval: {args.interval:g} minutes "
+                f"(adapting between {feeds.FEED_MIN_INTERVAL / 60:g} and {feeds.FEED_MAX_INTERVAL / 60:g})")
+    if METRICS_PORT and not args.once:
+        metrics.serve(METRICS_PORT)
+        logger.info(f"📈 Serving metrics on port {METRICS_PORT}")
     
     if args.once:
         # Run once and exit
         run_tech_news_collection()
+        drain_pending_summaries()
         get_tech_stats()
     else:
-        # Schedule regular collection
-        schedule.every(args.interval).minutes.do(run_tech_news_collection)
+        # Summarize new articles in the background while collection carries on
+        summary_workers = SummaryWorkerPool()
+        summary_workers.start()
+        logger.info(f"🤖 Started {summary_workers.workers} summary workers")
         
-        # Run initial collection
-        logger.info("🔄 Running initial tech news collection...")
-        run_tech_news_collection()
+        schedule.every().day.at("03:30").do(run_daily_retention)
+        
+        # Feeds are polled when due, in cycles on background threads, so a
+        # slow cycle never holds up the others or the daily jobs
+        create_table()
+        feed_scheduler = feeds.FeedScheduler(run_feed_cycle)
         get_tech_stats()
         
-        # Keep running
-        logger.info(f"⏰ Scheduler running - will collect tech news every {args.interval} minutes")
+        logger.info(f"⏰ Scheduler running - up to {feed_scheduler.cycle_size} feeds per cycle")
         logger.info("Press Ctrl+C to stop")
         
         try:
             while True:
                 schedule.run_pending()
-                time.sleep(60)  # Check every minute
+                started = feed_scheduler.tick()
+                if started:
+                    logger.info(f"🔄 Polling {started} due feeds...")
+                feed_scheduler.wait(60)
         except KeyboardInterrupt:
             logger.info("🛑 Scheduler stopped by user")
         except Exception as e:
             logger.error(f"❌ Scheduler error: {e}")
+        finally:
+            summary_workers.stop()
 
 if __name__ == "__main__":
     main()
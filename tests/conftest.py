@@ -0,0 +1,88 @@
+import os
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from stand_in import StandInConfig, StandInServer
+
+# Local stand-in for Ollama and the news sites; the app reads its URL from
+# the environment at import, so it starts before any test module loads
+STAND_IN = StandInServer(config=StandInConfig(feeds=3, items=5, full_content=1.0))
+_data_dir = tempfile.TemporaryDirectory(prefix="techhub-tests-")
+
+def pytest_configure(config):
+    STAND_IN.start()
+    # Never the configured DATABASE_URL: the tests delete rows. Set
+    # TEST_DATABASE_URL to run them against PostgreSQL.
+    os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL") or f"sqlite:///{_data_dir.name}/test.db"
+    os.environ["ARCHIVE_DATABASE_URL"] = os.environ["DATABASE_URL"]
+    os.environ["OLLAMA_URL"] = STAND_IN.url
+    # Retries are the queue's job in these tests, not the HTTP client's
+    os.environ["OLLAMA_RETRIES"] = "0"
+    os.environ["FEED_ALLOW_PRIVATE_HOSTS"] = "1"
+
+def pytest_unconfigure(config):
+    STAND_IN.stop()
+    _data_dir.cleanup()
+
+@pytest.fixture(scope="session")
+def database():
+    from src.models import engine, init_db
+    init_db()
+    return engine
+
+@pytest.fixture
+def stand_in():
+    STAND_IN.config.llm_failures = 0
+    return STAND_IN
+
+@pytest.fixture
+def clean_queue(database):
+    from src.models import SessionLocal, PendingSummary
+    db = SessionLocal()
+    try:
+        db.query(PendingSummary).delete()
+        db.commit()
+    finally:
+        db.close()
+
+@pytest.fixture
+def make_articles(database, clean_queue):
+    """Store ``count`` articles with unique text (or ``content``) through the collector's save path, returning their ids"""
+    from src.collector import save_articles
+    from src.models import SessionLocal, Article
+
+    def make(count=1, length=600, title="Test article", content=None, feed_url="https://tests.example/feed.xml"):
+        run = uuid.uuid4().hex
+        articles = [{
+            "title": f"{title} {run} {i}",
+            "link": f"https://tests.example/{run}/{i}",
+            "content": content or " ".join(f"word{run[:8]}{i}x{n}" for n in range(length // 12 + 1))[:length],
+            "summary": "",
+            "image_url": None,
+            "published": datetime.now(timezone.utc),
+            "feed_url": feed_url
+        } for i in range(count)]
+        save_articles(articles)
+        db = SessionLocal()
+        try:
+            rows = db.query(Article.id, Article.link).filter(Article.link.in_([a["link"] for a in articles])).all()
+        finally:
+            db.close()
+        ids = {row.link: row.id for row in rows}
+        return [ids[a["link"]] for a in articles]
+
+    return make
+
+@pytest.fixture(scope="session")
+def client(database):
+    from fastapi.testclient import TestClient
+    from src.main import app
+    return TestClient(app)
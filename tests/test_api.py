@@ -0,0 +1,128 @@
+import random
+import string
+import time
+
+import pytest
+
+def random_word(length):
+    return "".join(random.choices(string.ascii_lowercase, k=length))
+
+@pytest.mark.parametrize("params", [{"limit": 0}, {"limit": 0, "since_id": 0}, {"limit": 101}, {"offset": -1}])
+def test_articles_rejects_out_of_range_paging(client, params):
+    assert client.get("/articles", params=params).status_code == 422
+
+def test_articles_since_id_pages(client, make_articles):
+    ids = make_articles(3)
+    first = client.get("/articles", params={"since_id": ids[0] - 1, "limit": 2, "fields": "id"})
+    assert first.status_code == 200
+    assert [a["id"] for a in first.json()] == ids[:2]
+    rest = client.get("/articles", params={"since_id": first.headers["X-Next-Since-Id"], "limit": 2, "fields": "id"})
+    assert [a["id"] for a in rest.json()] == ids[2:]
+
+@pytest.mark.parametrize("limit", [0, 101])
+def test_search_rejects_out_of_range_limit(client, limit):
+    assert client.get("/search", params={"q": "news", "limit": limit}).status_code == 422
+
+@pytest.mark.parametrize("before", ["junk", "1.5", "abc,1", "1.5,x"])
+def test_search_rejects_malformed_cursor(client, before):
+    response = client.get("/search", params={"q": "news", "before": before})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor, expected before=<score>,<id>"
+
+@pytest.mark.parametrize("days", [0, 367, 100000000])
+def test_stats_rejects_out_of_range_days(client, days):
+    assert client.get("/stats", params={"days": days}).status_code == 422
+
+def test_stats_counts_by_day(client, make_articles):
+    make_articles(2)
+    stats = client.get("/stats", params={"days": 3}).json()
+    assert len(stats["articles_by_day"]) == 3
+    assert stats["articles_today"] >= 2
+    assert stats["total_articles"] >= stats["articles_today"]
+
+def test_summaries_revalidate_articles_but_not_stats(client, make_articles, stand_in):
+    [article_id] = make_articles(1)
+    stats_tag = client.get("/stats").headers["ETag"]
+    articles_tag = client.get("/articles").headers["ETag"]
+
+    from src.summary_queue import summarize_pending
+    assert summarize_pending(article_id)
+
+    assert client.get("/stats", headers={"If-None-Match": stats_tag}).status_code == 304
+    assert client.get("/articles", headers={"If-None-Match": articles_tag}).status_code == 200
+
+def test_trending_is_tagged_with_the_version_it_was_built_from(client, make_articles, monkeypatch):
+    from src.http_cache import data_version
+    from src.simple_trending import trending_detector
+    monkeypatch.setattr(trending_detector, "cache", type(trending_detector.cache)(60, 4, version=data_version.get))
+
+    make_articles(2)
+    built = client.get("/trending")
+    assert built.status_code == 200
+
+    # New data: the previous result is served, still under its own tag
+    make_articles(1)
+    stale = client.get("/trending", headers={"If-None-Match": built.headers["ETag"]})
+    assert stale.status_code == 304
+    # ...until the background recompute lands
+    for _ in range(100):
+        if client.get("/trending").headers["ETag"] != built.headers["ETag"]:
+            break
+        time.sleep(0.05)
+    else:
+        pytest.fail("trending was never recomputed for the new data")
+
+def walk(client, path, params, cursor_param="before"):
+    """Follow X-Next-Cursor from the first page to the last, returning every page"""
+    pages = []
+    params = dict(params)
+    while True:
+        response = client.get(path, params=params)
+        assert response.status_code == 200, response.text
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+        params[cursor_param] = cursor
+
+def test_articles_cursor_walks_every_article_once_newest_first(client, make_articles):
+    make_articles(5)
+    first = client.get("/articles", params={"limit": 100, "fields": "id,published"}).json()
+    pages = walk(client, "/articles", {"limit": 2, "fields": "id,published"})
+
+    walked = [article for page in pages for article in page]
+    assert walked == first
+    keys = [(article["published"], article["id"]) for article in walked]
+    assert keys == sorted(keys, reverse=True)
+    assert len(set(keys)) == len(keys)
+
+def test_articles_cursor_breaks_ties_on_id(client, make_articles):
+    from src.models import SessionLocal, Article
+    ids = make_articles(3)
+    db = SessionLocal()
+    published = db.get(Article, ids[0]).published
+    db.query(Article).filter(Article.id.in_(ids)).update({"published": published}, synchronize_session=False)
+    db.commit()
+    db.close()
+
+    cursor = f"{published.isoformat()},{ids[2]}"
+    page = client.get("/articles", params={"before": cursor, "limit": 2, "fields": "id"}).json()
+    assert [article["id"] for article in page] == [ids[1], ids[0]]
+
+def test_articles_rejects_malformed_cursor(client):
+    response = client.get("/articles", params={"before": "yesterday"})
+    assert response.status_code == 400
+
+def test_search_cursor_walks_every_match_once(client, make_articles):
+    word = random_word(12)
+    ids = [
+        make_articles(1, content=" ".join([random_word(8) for _ in range(40)] + [word] * count))[0]
+        for count in range(1, 6)
+    ]
+
+    pages = walk(client, "/search", {"q": word, "limit": 2})
+    walked = [result["id"] for page in pages for result in page]
+    assert sorted(walked) == sorted(ids)
+    assert len(pages) == 3
+    scores = [result["score"] for page in pages for result in page]
+    assert scores == sorted(scores, reverse=True)
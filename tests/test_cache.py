@@ -0,0 +1,93 @@
+import threading
+import time
+
+from src.cache import TTLCache
+
+class Version:
+    def __init__(self):
+        self.value = 1
+
+    def get(self):
+        return self.value
+
+def slow(value, started=None, release=None):
+    def compute():
+        if started:
+            started.set()
+        if release:
+            release.wait(5)
+        return value
+    return compute
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_concurrent_misses_share_one_computation():
+    cache = TTLCache(ttl=60, maxsize=4)
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return "result"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("key", compute))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == ["result"] * 5
+    assert len(calls) == 1
+
+def test_new_version_serves_previous_result_with_its_version():
+    version = Version()
+    cache = TTLCache(ttl=60, maxsize=4, version=version.get)
+    assert cache.get_versioned("key", slow("old")) == ("old", 1)
+
+    version.value = 2
+    started, release = threading.Event(), threading.Event()
+    # No blocking: the old value comes back tagged with the old version
+    assert cache.get_versioned("key", slow("new", started, release)) == ("old", 1)
+    assert started.wait(5)
+    # The refresh is already running, so no second one starts
+    assert cache.get_versioned("key", slow("other")) == ("old", 1)
+
+    release.set()
+    assert wait_for(lambda: cache.get_versioned("key", slow("other")) == ("new", 2))
+
+def test_cold_key_waits_for_its_version():
+    version = Version()
+    cache = TTLCache(ttl=60, maxsize=4, version=version.get)
+    version.value = 5
+    assert cache.get_versioned("key", slow("fresh")) == ("fresh", 5)
+
+def test_expired_entry_is_served_while_refreshing():
+    cache = TTLCache(ttl=0.05, maxsize=4)
+    assert cache.get("key", slow(1)) == 1
+    time.sleep(0.1)
+    assert cache.get("key", slow(2)) == 1
+    assert wait_for(lambda: cache.get("key", slow(3)) == 2)
+
+def test_slow_refresh_does_not_replace_newer_version():
+    version = Version()
+    cache = TTLCache(ttl=60, maxsize=4, version=version.get)
+    cache.get("key", slow("v1"))
+
+    version.value = 2
+    started, release = threading.Event(), threading.Event()
+    cache.get("key", slow("v2", started, release))
+    assert started.wait(5)
+
+    version.value = 3
+    cache.get("key", slow("v3"))
+    assert wait_for(lambda: cache.get_versioned("key", slow("x")) == ("v3", 3))
+    release.set()
+    time.sleep(0.1)
+    assert cache.get_versioned("key", slow("x")) == ("v3", 3)
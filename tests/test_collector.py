@@ -0,0 +1,61 @@
+import uuid
+
+import pytest
+
+from src.collector import CollectionProgress, fetch_articles, iter_articles, load_feed_states, normalize_link
+from src.fetcher import Fetcher
+
+def fresh_run(stand_in, monkeypatch, **config):
+    # New links, so nothing from an earlier test counts as already stored
+    monkeypatch.setattr(stand_in.config, "run_id", uuid.uuid4().hex[:8])
+    for name, value in config.items():
+        monkeypatch.setattr(stand_in.config, name, value)
+
+def test_articles_stream_feed_by_feed(database, stand_in, monkeypatch):
+    fresh_run(stand_in, monkeypatch, full_content=1.0)
+    feed_urls = stand_in.feed_urls()
+    progress = CollectionProgress()
+    feed_states = {}
+    with Fetcher(max_per_host=1) as fetcher:
+        articles = iter_articles(fetcher, feed_states, progress, feed_urls)
+        first = next(articles)
+        # Handed on before the remaining feeds were taken in
+        assert progress.feeds_done == 1
+        articles = [first, *articles]
+
+    assert len(articles) == stand_in.config.feeds * stand_in.config.items
+    assert set(feed_states) == set(feed_urls)
+
+def test_entries_without_full_content_are_downloaded(database, stand_in, monkeypatch):
+    fresh_run(stand_in, monkeypatch, full_content=0.0)
+    progress = CollectionProgress()
+    articles = list(iter_articles(progress=progress, feed_urls=stand_in.feed_urls()))
+
+    assert len(articles) == stand_in.config.feeds * stand_in.config.items
+    assert all(article["content"] for article in articles)
+    assert progress.downloads_avoided == 0
+    assert progress.error_count == 0
+
+def test_validators_are_left_to_the_caller(database, stand_in, monkeypatch):
+    fresh_run(stand_in, monkeypatch)
+    feed_urls = stand_in.feed_urls()
+    feed_states = {}
+    articles = fetch_articles(feed_urls=feed_urls, feed_states=feed_states)
+
+    assert articles
+    assert set(feed_states) == set(feed_urls)
+    # Nothing saved yet, so a failed save_articles refetches these entries
+    assert not any(state["content_hash"] for state in load_feed_states(feed_urls).values())
+
+@pytest.mark.parametrize("raw, normalized", [
+    ("https://Example.com/story/?utm_source=rss&utm_medium=feed", "https://example.com/story"),
+    ("HTTPS://EXAMPLE.COM/a/b/", "https://example.com/a/b"),
+    ("https://example.com/story?id=7&fbclid=abc&ref=home#comments", "https://example.com/story?id=7"),
+    ("https://example.com?page=2&UTM_Campaign=x", "https://example.com/?page=2"),
+    ("  https://example.com/  ", "https://example.com/"),
+    ("https://example.com/search?q=&sort=new", "https://example.com/search?q=&sort=new"),
+    ("/relative/path", "/relative/path"),
+    ("not a url", "not a url"),
+])
+def test_normalize_link(raw, normalized):
+    assert normalize_link(raw) == normalized
@@ -0,0 +1,100 @@
+"""Dialect-specific SQL, run against whichever database TEST_DATABASE_URL
+points at (SQLite by default; CI also runs these against PostgreSQL)"""
+import random
+import string
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+
+from src.collector import save_articles
+from src.models import engine, SessionLocal, Article, dialect_insert
+from src.search import POSTGRES_DOCUMENT, search_articles
+from src.stats import get_article_counts
+
+postgres_only = pytest.mark.skipif(engine.dialect.name != "postgresql", reason="PostgreSQL only")
+sqlite_only = pytest.mark.skipif(engine.dialect.name != "sqlite", reason="SQLite only")
+
+def unique_word():
+    # Letters only, so every tokenizer keeps it as one searchable word
+    return "".join(random.choices(string.ascii_lowercase, k=12))
+
+def explain(sql, params=None):
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            # The test tables are tiny; make the planner show whether it can use an index at all
+            conn.execute(text("SET enable_seqscan = off"))
+            rows = conn.execute(text(f"EXPLAIN {sql}"), params or {}).all()
+            return "\n".join(row[0] for row in rows)
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params or {}).all()
+        return "\n".join(row[-1] for row in rows)
+
+def test_insert_on_conflict_returns_only_new_rows(make_articles):
+    [existing_id] = make_articles(1)
+    db = SessionLocal()
+    try:
+        existing = db.get(Article, existing_id)
+        table = Article.__table__
+        stmt = dialect_insert(table).on_conflict_do_nothing(index_elements=["link"]).returning(table.c.id, table.c.link)
+        new_link = existing.link + "/new"
+        result = db.execute(stmt, [
+            {"title": "Again", "link": existing.link, "published": existing.published},
+            {"title": "New", "link": new_link, "published": existing.published},
+        ]).all()
+        db.commit()
+        assert [row.link for row in result] == [new_link]
+        assert db.query(Article).filter(Article.link == existing.link).one().title == existing.title
+    finally:
+        db.close()
+
+def test_saving_again_skips_stored_links_and_keeps_counts(make_articles):
+    feed_url = f"https://tests.example/{unique_word()}.xml"
+    ids = make_articles(3, feed_url=feed_url)
+    assert get_article_counts()["by_feed"][feed_url] == 3
+
+    db = SessionLocal()
+    try:
+        rows = db.query(Article).filter(Article.id.in_(ids)).all()
+        again = [{"title": a.title, "link": a.link, "content": "", "summary": "", "image_url": None,
+                  "published": a.published, "feed_url": feed_url} for a in rows]
+    finally:
+        db.close()
+    assert save_articles(again) == 0
+    assert get_article_counts()["by_feed"][feed_url] == 3
+
+def test_search_ranks_and_pages_matches(make_articles):
+    word = unique_word()
+    filler = " ".join(unique_word() for _ in range(60))
+    [in_title_and_body] = make_articles(1, title=f"{word} report", content=f"{filler} {word} {word}")
+    [in_body] = make_articles(1, content=f"{filler} {word}")
+    make_articles(1, content=filler)
+
+    results, cursor = search_articles(word, limit=1)
+    assert [r["id"] for r in results] == [in_title_and_body]
+    assert cursor
+    more, _ = search_articles(word, limit=5, before=cursor)
+    assert [r["id"] for r in more] == [in_body]
+    assert f"<mark>{word}</mark>" in results[0]["snippet"]
+
+@postgres_only
+def test_postgres_search_uses_gin_index():
+    plan = explain(f"""
+        SELECT a.id, ts_rank_cd({POSTGRES_DOCUMENT}, query) AS score
+        FROM articles a, websearch_to_tsquery('english', :q) query
+        WHERE {POSTGRES_DOCUMENT} @@ query AND a.archived_at IS NULL
+    """, {"q": "anything"})
+    assert "ix_articles_fts" in plan, plan
+
+@sqlite_only
+def test_sqlite_search_uses_fts_index():
+    plan = explain("SELECT rowid FROM articles_fts WHERE articles_fts MATCH :match", {"match": '"anything"'})
+    assert "VIRTUAL TABLE INDEX" in plan, plan
+
+def test_archiving_scans_live_articles_by_index():
+    # The query retention.archive_batch runs
+    plan = explain("""
+        SELECT id FROM articles
+        WHERE archived_at IS NULL AND published < :cutoff
+        ORDER BY published, id LIMIT 100
+    """, {"cutoff": datetime.now(timezone.utc) - timedelta(days=30)})
+    assert "ix_articles_live_published_id" in plan, plan
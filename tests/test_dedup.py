@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src.collector import save_articles
+from src.content_store import load_contents
+from src.dedup import BAND_BITS, MAX_DISTANCE, find_canonicals, simhash
+from src.models import SessionLocal, Article, ArticleFingerprint
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def flip(fingerprint, bits):
+    for bit in bits:
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+@pytest.fixture
+def stored(make_articles):
+    """An article with a stored fingerprint, as ``(id, fingerprint)``"""
+    [article_id] = make_articles(1, length=2000)
+    db = SessionLocal()
+    try:
+        row = db.get(ArticleFingerprint, article_id)
+        return article_id, row.simhash & ((1 << 64) - 1)
+    finally:
+        db.close()
+
+def canonical(fingerprint):
+    db = SessionLocal()
+    try:
+        return find_canonicals(db, {"link": fingerprint}).get("link")
+    finally:
+        db.close()
+
+def test_matches_up_to_max_distance_in_any_bands(stored):
+    article_id, fingerprint = stored
+    assert MAX_DISTANCE == 3
+    # One bit in each of three bands, so only the fourth band matches exactly
+    assert canonical(flip(fingerprint, [0, BAND_BITS, 2 * BAND_BITS])) == article_id
+    # All in one band
+    assert canonical(flip(fingerprint, [1, 2, 3])) == article_id
+
+def test_no_match_beyond_max_distance(stored):
+    _, fingerprint = stored
+    assert canonical(flip(fingerprint, [1, 2, 3, 4])) is None
+    assert canonical(flip(fingerprint, [0, BAND_BITS, 2 * BAND_BITS, 3 * BAND_BITS])) is None
+
+def test_same_story_under_another_link_is_linked(stored):
+    article_id, _ = stored
+    db = SessionLocal()
+    try:
+        original = db.get(Article, article_id)
+        content = load_contents(db, [article_id])[article_id]
+    finally:
+        db.close()
+    assert simhash(f"{original.title}\n{content}") is not None
+
+    copy = {"title": original.title, "link": original.link + "?copy", "content": content, "summary": "",
+            "image_url": None, "published": original.published, "feed_url": None}
+    assert save_articles([copy]) == 1
+    db = SessionLocal()
+    try:
+        assert db.query(Article.canonical_id).filter(Article.link == copy["link"]).scalar() == article_id
+    finally:
+        db.close()
+
+@pytest.mark.parametrize("value", ["4", "-1"])
+def test_max_distance_beyond_band_guarantee_is_rejected(value):
+    env = dict(os.environ, DEDUP_MAX_DISTANCE=value)
+    result = subprocess.run([sys.executable, "-c", "import src.dedup"], cwd=ROOT, env=env,
+                            capture_output=True, text=True)
+    assert result.returncode != 0
+    assert "DEDUP_MAX_DISTANCE must be between 0 and 3" in result.stderr
@@ -0,0 +1,139 @@
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src import feeds
+from src.feeds import FeedScheduler, import_opml, next_interval, record_polls, register_feeds
+from src.models import SessionLocal, FeedState, as_utc
+
+@pytest.fixture
+def no_jitter(monkeypatch):
+    monkeypatch.setattr(feeds, "FEED_JITTER", 0)
+
+@pytest.fixture
+def empty_registry(database):
+    db = SessionLocal()
+    db.query(FeedState).delete()
+    db.commit()
+    db.close()
+
+def feed_url():
+    return f"https://feeds.example/{uuid.uuid4().hex}.xml"
+
+def state(url):
+    db = SessionLocal()
+    try:
+        return db.query(FeedState).filter(FeedState.feed_url == url).one()
+    finally:
+        db.close()
+
+def delay(url, now):
+    return (as_utc(state(url).next_poll_at) - now).total_seconds()
+
+def test_next_interval_follows_update_rate_within_bounds():
+    assert next_interval(None) == feeds.FEED_DEFAULT_INTERVAL
+    assert next_interval(0) == feeds.FEED_MAX_INTERVAL
+    assert next_interval(0.5) == 7200
+    assert next_interval(100) == feeds.FEED_MIN_INTERVAL
+    assert next_interval(1e-6) == feeds.FEED_MAX_INTERVAL
+
+def test_failing_feed_backs_off_exponentially_up_to_the_cap(database, no_jitter):
+    url = feed_url()
+    now = datetime.now(timezone.utc)
+    delays = []
+    for _ in range(7):
+        record_polls({url: {"failed": 1, "error": "HTTP 503"}}, now=now)
+        delays.append(delay(url, now))
+    assert delays[:4] == [7200, 14400, 28800, 57600]
+    assert delays[4:] == [feeds.FEED_MAX_BACKOFF] * 3
+    assert state(url).failures == 7
+    assert state(url).last_error == "HTTP 503"
+
+    # One good poll clears the failures
+    record_polls({url: {"new_entries": 2}}, now=now + timedelta(hours=1))
+    assert state(url).failures == 0
+    assert state(url).last_error is None
+
+def test_interval_tracks_rate_and_at_most_doubles(database, no_jitter):
+    url = feed_url()
+    now = datetime.now(timezone.utc)
+    # The first poll only sees the backlog
+    record_polls({url: {"new_entries": 10}}, now=now)
+    assert state(url).update_rate is None
+    assert delay(url, now) == feeds.FEED_DEFAULT_INTERVAL
+
+    now += timedelta(hours=1)
+    record_polls({url: {"new_entries": 4}}, now=now)
+    assert state(url).update_rate == pytest.approx(4)
+    assert delay(url, now) == 900
+
+    # A silent feed slows down, but never more than twofold per poll
+    intervals = []
+    for _ in range(8):
+        now += timedelta(seconds=state(url).poll_interval)
+        record_polls({url: {"new_entries": 0}}, now=now)
+        intervals.append(state(url).poll_interval)
+    assert all(later <= 2 * earlier for earlier, later in zip([900] + intervals, intervals))
+    assert intervals[-1] > intervals[0]
+
+def wait_idle(scheduler, timeout=5):
+    idle = threading.Event()
+    for _ in range(int(timeout / 0.05)):
+        if scheduler.running == 0:
+            return
+        idle.wait(0.05)
+    pytest.fail("the cycle never finished")
+
+def test_scheduler_polls_due_feeds_in_bounded_cycles(empty_registry):
+    urls = [feed_url() for _ in range(3)]
+    register_feeds([(url, None) for url in urls])
+    polled = []
+    release = threading.Event()
+
+    def run(feed_urls):
+        polled.append(list(feed_urls))
+        release.wait(5)
+        record_polls({url: {"new_entries": 0} for url in feed_urls})
+
+    scheduler = FeedScheduler(run, cycle_size=2, max_cycles=1, refresh_seconds=0)
+    assert scheduler.tick() == 2
+    # The one cycle allowed is still running
+    assert scheduler.tick() == 0
+    assert scheduler.running == 2
+
+    release.set()
+    wait_idle(scheduler)
+    assert scheduler.tick() == 1
+    wait_idle(scheduler)
+    # Everything polled once and rescheduled for later
+    assert sorted(url for cycle in polled for url in cycle) == sorted(urls)
+    assert scheduler.tick() == 0
+
+def test_failed_cycle_reschedules_its_feeds(empty_registry, no_jitter):
+    url = feed_url()
+    register_feeds([(url, None)])
+    done = threading.Event()
+
+    def run(feed_urls):
+        raise RuntimeError("network down")
+
+    scheduler = FeedScheduler(run, refresh_seconds=0)
+    original = scheduler._cycle
+    scheduler._cycle = lambda feed_urls: (original(feed_urls), done.set())
+    assert scheduler.tick() == 1
+    assert done.wait(5)
+    assert state(url).failures == 1
+    assert state(url).last_error == "network down"
+
+def test_opml_import_rejects_non_http_and_private_feeds(monkeypatch, empty_registry):
+    monkeypatch.setattr(feeds, "ALLOW_PRIVATE_HOSTS", False)
+    opml = b"""<?xml version="1.0"?><opml version="2.0"><body>
+        <outline text="Local" xmlUrl="http://127.0.0.1:8080/feed.xml"/>
+        <outline text="Metadata" xmlUrl="http://169.254.169.254/latest/meta-data/"/>
+        <outline text="File" xmlUrl="file:///etc/passwd"/>
+    </body></opml>"""
+    result = import_opml(opml)
+    assert result["added"] == 0
+    assert len(result["rejected"]) == 3
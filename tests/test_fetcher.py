@@ -0,0 +1,41 @@
+import pytest
+import requests
+
+from src import fetcher as fetcher_module
+from src.feeds import check_feed_url
+from src.fetcher import Fetcher, is_public_address
+
+@pytest.fixture
+def public_loopback(monkeypatch):
+    """Treat 127.0.0.1 (the stand-in) as public and every other address as private"""
+    monkeypatch.setattr(fetcher_module, "is_public_address", lambda address: address == "127.0.0.1")
+
+def test_public_address_check():
+    assert is_public_address("93.184.216.34")
+    for address in ("127.0.0.1", "10.0.0.5", "192.168.1.1", "169.254.169.254", "::1", "fe80::1%eth0", "::ffff:127.0.0.1"):
+        assert not is_public_address(address), address
+
+def test_check_feed_url_rejects_other_schemes():
+    for url in ("file:///etc/passwd", "ftp://example.com/feed", "http://"):
+        with pytest.raises(ValueError):
+            check_feed_url(url)
+
+def test_fetcher_refuses_private_addresses(stand_in):
+    with Fetcher(allow_private_hosts=False) as fetcher:
+        with pytest.raises(requests.ConnectionError, match="non-public address"):
+            fetcher.get(f"{stand_in.url}/feeds/0.xml")
+        with pytest.raises(requests.ConnectionError, match="non-public address"):
+            fetcher.download(f"{stand_in.url}/articles/0/run/0", 1_000_000)
+
+def test_fetcher_checks_every_redirect_hop(stand_in, public_loopback):
+    port = stand_in.httpd.server_address[1]
+    with Fetcher(allow_private_hosts=False) as fetcher:
+        assert fetcher.get(f"{stand_in.url}/feeds/0.xml").status_code == 200
+        # A public URL that redirects into the private network
+        target = f"http://127.0.0.2:{port}/feeds/0.xml"
+        with pytest.raises(requests.ConnectionError, match="non-public address 127.0.0.2"):
+            fetcher.get(f"{stand_in.url}/redirect?to={target}")
+        with pytest.raises(requests.ConnectionError, match="non-public address 127.0.0.2"):
+            fetcher.download(f"{stand_in.url}/redirect?to={target}", 1_000_000)
+        # Public-to-public redirects are still followed
+        assert fetcher.get(f"{stand_in.url}/redirect?to=/feeds/0.xml").status_code == 200
@@ -0,0 +1,99 @@
+import time
+from datetime import datetime, timezone
+
+from src import summary_queue
+from src.models import SessionLocal, Article, PendingSummary, as_utc
+from src.summary_queue import SummaryWorkerPool, _claim, due_article_ids, summarize_pending
+
+def wait_until(condition, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+def summaries(ids):
+    db = SessionLocal()
+    try:
+        return {row.id: row.summary for row in db.query(Article.id, Article.summary).filter(Article.id.in_(ids))}
+    finally:
+        db.close()
+
+def pending(article_id):
+    db = SessionLocal()
+    try:
+        return db.get(PendingSummary, article_id)
+    finally:
+        db.close()
+
+def test_workers_summarize_queued_articles(make_articles, stand_in):
+    ids = make_articles(4)
+    assert set(ids) <= set(due_article_ids())
+    calls_before = stand_in.config.llm_calls
+
+    pool = SummaryWorkerPool(workers=2, poll_interval=0.1)
+    pool.start()
+    try:
+        assert wait_until(lambda: all(summaries(ids).values()))
+    finally:
+        pool.stop()
+
+    assert all(summary.startswith("Stub summary") for summary in summaries(ids).values())
+    assert not set(ids) & set(due_article_ids())
+    assert stand_in.config.llm_calls - calls_before == len(ids)
+
+def test_short_articles_are_not_queued(make_articles):
+    [article_id] = make_articles(1, length=50)
+    assert article_id not in due_article_ids()
+
+def test_lease_blocks_other_workers_until_it_expires(make_articles, monkeypatch):
+    monkeypatch.setattr(summary_queue, "LEASE_SECONDS", 0.5)
+    [article_id] = make_articles(1)
+
+    assert _claim(article_id) is not None
+    # Held: neither listed as due nor claimable by another worker
+    assert _claim(article_id) is None
+    assert article_id not in due_article_ids()
+
+    time.sleep(0.6)
+    assert article_id in due_article_ids()
+    assert _claim(article_id) is not None
+
+def test_failed_summaries_back_off_then_give_up(make_articles, stand_in, monkeypatch):
+    monkeypatch.setattr(summary_queue, "RETRY_BACKOFF", 30)
+    monkeypatch.setattr(summary_queue, "MAX_ATTEMPTS", 3)
+    [article_id] = make_articles(1)
+    stand_in.config.llm_failures = 100
+
+    for attempt in (1, 2):
+        before = datetime.now(timezone.utc)
+        assert summarize_pending(article_id) is False
+        row = pending(article_id)
+        assert row.attempts == attempt
+        assert row.claimed_until is None
+        expected = 30 * 2 ** (attempt - 1)
+        delay = (as_utc(row.next_attempt_at) - before).total_seconds()
+        assert expected - 1 <= delay <= expected + 5
+        assert article_id not in due_article_ids()
+
+        # Make it due now instead of waiting out the backoff
+        db = SessionLocal()
+        db.query(PendingSummary).filter(PendingSummary.article_id == article_id).update({"next_attempt_at": None})
+        db.commit()
+        db.close()
+
+    assert summarize_pending(article_id) is False
+    assert pending(article_id) is None
+    assert not summaries([article_id])[article_id]
+
+def test_retry_succeeds_once_the_model_recovers(make_articles, stand_in, monkeypatch):
+    monkeypatch.setattr(summary_queue, "RETRY_BACKOFF", 0)
+    [article_id] = make_articles(1)
+    stand_in.config.llm_failures = 1
+
+    assert summarize_pending(article_id) is False
+    assert article_id in due_article_ids()
+    assert summarize_pending(article_id) is True
+    assert pending(article_id) is None
+    assert summaries([article_id])[article_id].startswith("Stub summary")
@@ -0,0 +1,77 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from src.trending_scorer import TermMatrix, rank_articles
+
+POSTINGS = [
+    # (article_id, term, count, in_title)
+    (10, "chip", 3, 1),
+    (10, "ai", 1, 0),
+    (11, "ai", 2, 1),
+    (11, "robot", 1, 0),
+    (12, "chip", 1, 0),
+    (13, "weather", 5, 0),
+]
+
+def brute_force(postings, keywords, weighting, n_documents):
+    """The per-article loop the matrix replaces"""
+    totals, df = {}, {}
+    for _, term, count, _ in postings:
+        totals[term] = totals.get(term, 0) + count
+        df[term] = df.get(term, 0) + 1
+    weight = {
+        "presence": lambda term: 1.0,
+        "frequency": lambda term: totals[term],
+        "tfidf": lambda term: math.log((1 + n_documents) / (1 + df[term])) + 1.0,
+    }[weighting]
+    scores, matches = {}, {}
+    for article_id, term, _, in_title in postings:
+        if term in keywords:
+            scores[article_id] = scores.get(article_id, 0) + weight(term) + 2 * in_title
+            matches[article_id] = matches.get(article_id, 0) + 1
+    return scores, matches
+
+def test_top_terms_by_mentions_then_alphabetically():
+    matrix = TermMatrix.from_postings(POSTINGS)
+    terms = [matrix.vocabulary[i] for i in matrix.top_terms(3)]
+    # Mentions: weather 5, chip 4, ai 3
+    assert terms == ["weather", "chip", "ai"]
+    tied = TermMatrix.from_postings([(1, "beta", 2, 0), (2, "alpha", 2, 0), (3, "gamma", 1, 0)])
+    assert [tied.vocabulary[i] for i in tied.top_terms(2)] == ["alpha", "beta"]
+
+@pytest.mark.parametrize("weighting", ["presence", "frequency", "tfidf"])
+def test_scores_match_the_per_article_loop(weighting):
+    rng = random.Random(7)
+    vocabulary = [f"term{i}" for i in range(40)]
+    postings = []
+    for article_id in range(200):
+        for term in rng.sample(vocabulary, rng.randint(1, 8)):
+            postings.append((article_id, term, rng.randint(1, 5), rng.random() < 0.2))
+    matrix = TermMatrix.from_postings(postings, n_documents=250)
+    keywords = matrix.term_indices(vocabulary[:15])
+
+    scores, matches = matrix.score(keywords, weighting)
+    expected_scores, expected_matches = brute_force(postings, set(vocabulary[:15]), weighting, 250)
+    for row, article_id in enumerate(matrix.doc_ids):
+        assert scores[row] == pytest.approx(expected_scores.get(article_id, 0))
+        assert matches[row] == expected_matches.get(article_id, 0)
+
+def test_rank_articles_orders_by_score_then_id():
+    matrix = TermMatrix.from_postings(POSTINGS)
+    keywords = matrix.term_indices(["chip", "ai"])
+    # 10: chip+title, ai = 4; 11: ai+title = 3; 12: chip = 1; 13 has no keyword
+    assert rank_articles(matrix, 10, keywords=keywords) == [(10, 4, 2), (11, 3, 1), (12, 1, 1)]
+    assert rank_articles(matrix, 2, keywords=keywords) == [(10, 4, 2), (11, 3, 1)]
+
+    tie = TermMatrix.from_postings([(5, "x", 1, 0), (3, "x", 1, 0), (4, "x", 1, 0)])
+    assert [article_id for article_id, _, _ in rank_articles(tie, 2)] == [3, 4]
+
+def test_empty_matrix_and_unknown_weighting():
+    empty = TermMatrix.from_arrays(np.array([], dtype=np.int64), [], [], [], vocabulary=[])
+    assert rank_articles(empty, 5) == []
+    matrix = TermMatrix.from_postings(POSTINGS)
+    with pytest.raises(ValueError):
+        matrix.score(matrix.term_indices(["ai"]), weighting="bm25")